@@ -0,0 +1,74 @@
+"""
+Script pour mesurer la mémoire des items gardés par JsonWriterPipeline
+Usage: python benchmark_items.py [fichier_latest.json] [--count N]
+
+Compare, pour N fiches, des dicts classiques (COMPACT_ITEMS=False) et des
+CompactCharacterItem (COMPACT_ITEMS=True). Les fiches sont fabriquées à
+partir d'un export existant en repassant par json.loads, comme des chaînes
+fraîchement extraites : aucune chaîne n'est partagée par accident.
+"""
+
+import os
+import sys
+import json
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fandom_scrap'))
+
+from fandom_scrap.items import CompactCharacterItem
+
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'leagueoflegends_latest.json')
+
+
+def raw_items(source, count):
+    """N fiches JSON distinctes (nom et URLs suffixés) dérivées de l'export"""
+    with open(source, 'r', encoding='utf-8') as f:
+        samples = json.load(f)
+    if not samples:
+        raise ValueError(f"Aucune fiche dans {source}")
+
+    lines = []
+    for i in range(count):
+        item = dict(samples[i % len(samples)])
+        item['name'] = f"{item.get('name')} {i}"
+        item['page_url'] = f"{item.get('page_url')}_{i}"
+        item['image_url'] = f"{item.get('image_url')}?v={i}"
+        lines.append(json.dumps(item, ensure_ascii=False))
+    return lines
+
+
+def measure(lines, build):
+    """Octets alloués pour garder toutes les fiches construites par `build`"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [build(json.loads(line)) for line in lines]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(items), current - before, peak - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mémoire des items : dict vs CompactCharacterItem')
+    parser.add_argument('source', nargs='?', default=DEFAULT_SOURCE, help='Export *_latest.json')
+    parser.add_argument('--count', type=int, default=10000, help='Nombre de fiches')
+
+    args = parser.parse_args()
+
+    lines = raw_items(args.source, args.count)
+    print(f"[INFO] {args.count} fiches dérivées de {args.source}")
+
+    results = {}
+    for label, build in (('dict', dict), ('compact', CompactCharacterItem.from_mapping)):
+        count, retained, peak = measure(lines, build)
+        results[label] = retained
+        print(f"  {label:8} {retained / 1024 / 1024:8.2f} Mo retenus "
+              f"({retained / count:7.0f} o/fiche, pic {peak / 1024 / 1024:.2f} Mo)")
+
+    saved = 1 - results['compact'] / results['dict']
+    print(f"[RESULT] Gain mémoire : {saved:.0%}")
+
+
+if __name__ == "__main__":
+    main()
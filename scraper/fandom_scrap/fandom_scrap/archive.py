@@ -0,0 +1,221 @@
+"""
+Archive WARC des réponses brutes et rejeu hors ligne.
+
+- `ArchiveRecorder` (extension, ARCHIVE_ENABLED) écrit chaque réponse dans
+  `<ARCHIVE_DIR>/<fandom>_<timestamp>.warc.gz` : un membre gzip par
+  enregistrement WARC/1.0, un `warcinfo` (URL du wiki crawlé) puis un
+  `response` par réponse. Un index `.cdx.jsonl` donne
+  pour chaque enregistrement l'URL, le callback, l'offset et la longueur
+  compressée, pour relire une page sans décompresser tout le fichier.
+- `ArchiveReplayMiddleware` sert les requêtes marquées `archive_record`
+  depuis l'archive au lieu du réseau (voir `reextract.py`).
+"""
+
+import gzip
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+
+from fandom_scrap.writer import BackgroundWriter
+
+
+# En-têtes qui ne correspondent plus au corps stocké (déjà décompressé)
+_DROPPED_HEADERS = (b'Content-Encoding', b'Content-Length', b'Transfer-Encoding')
+
+
+class WarcWriter:
+    def __init__(self, path, fandom_url=None):
+        self.path = path
+        self.file = open(path, 'ab')
+        self.index = open(f"{path[:-len('.warc.gz')]}.cdx.jsonl", 'a', encoding='utf-8')
+        if fandom_url and self.file.tell() == 0:
+            self.write_warcinfo(fandom_url)
+
+    def close(self):
+        self.file.close()
+        self.index.close()
+
+    def write_warcinfo(self, fandom_url):
+        """Premier enregistrement : le wiki crawlé, relu par reextract.py"""
+        info = f"fandom-url: {fandom_url}\r\n".encode('utf-8')
+        warc_headers = (
+            "WARC/1.0\r\n"
+            "WARC-Type: warcinfo\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+            f"WARC-Filename: {os.path.basename(self.path)}\r\n"
+            "Content-Type: application/warc-fields\r\n"
+            f"Content-Length: {len(info)}\r\n"
+            "\r\n"
+        ).encode('utf-8')
+
+        member = gzip.compress(warc_headers + info + b'\r\n\r\n')
+        offset = self.file.tell()
+        self.file.write(member)
+
+        self.index.write(json.dumps({
+            'type': 'warcinfo',
+            'fandom_url': fandom_url,
+            'callback': None,
+            'offset': offset,
+            'length': len(member),
+        }) + '\n')
+
+    def write_response(self, response, callback):
+        status_line = f"HTTP/1.1 {response.status} OK\r\n".encode('latin-1')
+        headers = b''.join(
+            name + b': ' + value + b'\r\n'
+            for name, values in response.headers.items()
+            if name not in _DROPPED_HEADERS
+            for value in values
+        )
+        headers += f"Content-Length: {len(response.body)}\r\n".encode('latin-1')
+        http_block = status_line + headers + b'\r\n' + response.body
+
+        warc_headers = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+            f"WARC-Target-URI: {response.url}\r\n"
+            f"WARC-Fandom-Callback: {callback or ''}\r\n"
+            "Content-Type: application/http; msgtype=response\r\n"
+            f"Content-Length: {len(http_block)}\r\n"
+            "\r\n"
+        ).encode('utf-8')
+
+        member = gzip.compress(warc_headers + http_block + b'\r\n\r\n')
+        offset = self.file.tell()
+        self.file.write(member)
+
+        self.index.write(json.dumps({
+            'url': response.url,
+            'status': response.status,
+            'callback': callback,
+            'offset': offset,
+            'length': len(member),
+        }) + '\n')
+
+
+def read_index(archive_path):
+    """Entrées de l'index `.cdx.jsonl` d'une archive"""
+    with open(f"{archive_path[:-len('.warc.gz')]}.cdx.jsonl", 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_record(file, offset, length):
+    """Relit un enregistrement : (url, status, headers, body)"""
+    file.seek(offset)
+    record = gzip.decompress(file.read(length))
+
+    warc_part, _, http_block = record.partition(b'\r\n\r\n')
+    url = None
+    for line in warc_part.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        if name == b'WARC-Target-URI':
+            url = value.strip().decode('utf-8')
+
+    http_head, _, body = http_block.partition(b'\r\n\r\n')
+    head_lines = http_head.split(b'\r\n')
+    status = int(head_lines[0].split()[1])
+    headers = Headers()
+    for line in head_lines[1:]:
+        name, _, value = line.partition(b':')
+        headers.appendlist(name.strip(), value.strip())
+
+    content_length = int(headers.get(b'Content-Length', len(body)))
+    return url, status, headers, body[:content_length]
+
+
+class ArchiveRecorder:
+    """Enregistre les réponses téléchargées dans une archive WARC"""
+
+    def __init__(self, archive_dir, queue_size=100):
+        self.archive_dir = archive_dir
+        self.queue_size = queue_size
+        self.writer = None
+        self.background = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('ARCHIVE_ENABLED'):
+            raise NotConfigured
+        ext = cls(
+            crawler.settings.get('ARCHIVE_DIR', '../data/archives'),
+            crawler.settings.getint('WRITER_QUEUE_SIZE', 100),
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        return ext
+
+    def spider_opened(self, spider):
+        # Compression gzip et écritures dans le thread d'écriture, pas sur le réacteur
+        self.background = BackgroundWriter('ArchiveRecorder', self.queue_size)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.archive_dir, f"{spider.fandom_name}_{timestamp}.warc.gz")
+        self.background.submit_logged(spider, self.open_writer, path, spider.fandom_url)
+        spider.logger.info(f"Archiving raw responses to {path}")
+
+    def spider_closed(self, spider):
+        if self.background:
+            self.background.submit_logged(spider, self.close_writer)
+            return self.background.stop()
+
+    def response_received(self, response, request, spider):
+        if 'archive_record' in request.meta:
+            return
+        callback = getattr(request.callback, '__name__', None)
+        self.background.submit_logged(spider, self.write_response, response, callback)
+
+    def open_writer(self, path, target_url):
+        """(Thread d'écriture) Crée l'archive et son enregistrement warcinfo"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self.writer = WarcWriter(path, target_url)
+
+    def write_response(self, response, callback):
+        """(Thread d'écriture) Ajoute une réponse à l'archive"""
+        if self.writer:
+            self.writer.write_response(response, callback)
+
+    def close_writer(self):
+        if self.writer:
+            self.writer.close()
+
+
+class ArchiveReplayMiddleware:
+    """Sert les requêtes `archive_record` depuis l'archive, sans réseau"""
+
+    def __init__(self):
+        self.files = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        mw = cls()
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    def spider_closed(self, spider):
+        for file in self.files.values():
+            file.close()
+
+    def process_request(self, request, spider):
+        record = request.meta.get('archive_record')
+        if not record:
+            return None
+
+        archive_path, offset, length = record
+        if archive_path not in self.files:
+            self.files[archive_path] = open(archive_path, 'rb')
+
+        url, status, headers, body = read_record(self.files[archive_path], offset, length)
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, status=status, headers=headers, body=body, request=request)
@@ -0,0 +1,138 @@
+"""
+Contre-pression mémoire : met la découverte en pause près d'un budget.
+
+Toutes les MEMORY_BUDGET_CHECK_INTERVAL secondes, l'extension compare la
+mémoire résidente (RSS) à MEMORY_BUDGET_MB et la taille de la file du
+scheduler à MEMORY_BUDGET_MAX_QUEUE. Au-delà, `spider.discovery_paused`
+passe à True : les pages de catégories/sitemaps mettent leurs liens de côté
+(simples chaînes, bien plus légères que des Request) et leur pagination
+passe en basse priorité. Quand mémoire et file redescendent sous
+MEMORY_BUDGET_RESUME_RATIO du seuil, les liens mis de côté sont réinjectés
+par lots de MEMORY_BUDGET_RELEASE_BATCH.
+"""
+
+import os
+import sys
+
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider, NotConfigured
+from twisted.internet import task
+
+try:
+    import psutil
+except ImportError:  # optionnel, /proc suffit sous Linux
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # absent sous Windows
+    resource = None
+
+
+def current_rss_mb():
+    """Mémoire résidente du processus en Mo (None si indisponible)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    return None
+
+
+def peak_rss_mb():
+    """Pic de mémoire résidente du processus en Mo (None si indisponible)"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    if resource is not None:
+        # ru_maxrss : Ko sous Linux, octets sous macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    return None
+
+
+class MemoryBackpressure:
+    def __init__(self, crawler):
+        settings = crawler.settings
+        self.crawler = crawler
+        self.budget_mb = settings.getfloat('MEMORY_BUDGET_MB', 0)
+        self.max_queue = settings.getint('MEMORY_BUDGET_MAX_QUEUE', 0)
+        self.interval = settings.getfloat('MEMORY_BUDGET_CHECK_INTERVAL', 2.0)
+        self.resume_ratio = settings.getfloat('MEMORY_BUDGET_RESUME_RATIO', 0.8)
+        self.release_batch = settings.getint('MEMORY_BUDGET_RELEASE_BATCH', 100)
+        self.spider = None
+        self.loop = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getfloat('MEMORY_BUDGET_MB', 0) \
+                and not crawler.settings.getint('MEMORY_BUDGET_MAX_QUEUE', 0):
+            raise NotConfigured
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.spider_idle, signal=signals.spider_idle)
+        return ext
+
+    def spider_opened(self, spider):
+        self.spider = spider
+        self.loop = task.LoopingCall(self.check)
+        self.loop.start(self.interval, now=False)
+
+    def spider_closed(self, spider):
+        if self.loop and self.loop.running:
+            self.loop.stop()
+
+    def spider_idle(self, spider):
+        # Plus rien en file mais des liens mis de côté : on continue
+        if spider.deferred_links:
+            spider.discovery_paused = False
+            self.release()
+            raise DontCloseSpider
+
+    def queue_size(self):
+        engine = self.crawler.engine
+        slot = getattr(engine, '_slot', None) or getattr(engine, 'slot', None)
+        if slot is None:
+            return 0
+        return len(slot.scheduler)
+
+    def check(self):
+        rss = current_rss_mb()
+        queued = self.queue_size()
+        stats = self.crawler.stats
+        if rss is not None:
+            stats.max_value('memory_budget/peak_rss_mb', round(rss, 1))
+        stats.max_value('memory_budget/peak_queue', queued)
+        stats.set_value('memory_budget/deferred_links', len(self.spider.deferred_links))
+
+        over_memory = self.budget_mb and rss is not None and rss >= self.budget_mb
+        over_queue = self.max_queue and queued >= self.max_queue
+        memory_ok = not self.budget_mb or rss is None or rss < self.budget_mb * self.resume_ratio
+        queue_ok = not self.max_queue or queued < self.max_queue * self.resume_ratio
+
+        if not self.spider.discovery_paused and (over_memory or over_queue):
+            self.spider.discovery_paused = True
+            stats.inc_value('memory_budget/pauses')
+            self.spider.logger.info(f"Discovery paused (rss={rss and round(rss)} MB, queue={queued})")
+        elif self.spider.discovery_paused and memory_ok and queue_ok:
+            self.spider.discovery_paused = False
+            self.spider.logger.info(
+                f"Discovery resumed (rss={rss and round(rss)} MB, queue={queued}, "
+                f"{len(self.spider.deferred_links)} deferred links)"
+            )
+
+        if not self.spider.discovery_paused:
+            self.release()
+
+    def release(self):
+        """Réinjecte un lot de liens mis de côté dans le scheduler"""
+        for request in self.spider.release_deferred_links(self.release_batch):
+            self.crawler.engine.crawl(request)
@@ -0,0 +1,56 @@
+"""
+Crawl borné dans le temps (argument de spider `deadline`, en secondes).
+
+DEADLINE_DRAIN_SECONDS avant l'échéance (au plus 20 % du budget), la
+découverte s'arrête : `spider.draining` passe à True, les pages de
+catégories/sitemaps ne programment plus rien et les liens mis de côté sont
+abandonnés. Les fiches déjà en file continuent d'être téléchargées. À
+l'échéance, s'il reste du travail, le spider est fermé avec la raison
+`deadline` : les pipelines écrivent normalement les items déjà extraits et le
+rapport est produit.
+"""
+
+from scrapy import signals
+
+
+class CrawlDeadline:
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.drain_seconds = crawler.settings.getfloat('DEADLINE_DRAIN_SECONDS', 30)
+        self.calls = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        deadline = getattr(spider, 'deadline', None)
+        if not deadline:
+            return
+
+        from twisted.internet import reactor
+        drain = min(self.drain_seconds, deadline * 0.2)
+        self.calls = [
+            reactor.callLater(deadline - drain, self.start_drain, spider),
+            reactor.callLater(deadline, self.stop, spider),
+        ]
+        spider.logger.info(f"Deadline in {deadline:g}s, discovery stops {drain:g}s before")
+
+    def spider_closed(self, spider):
+        for call in self.calls:
+            if call.active():
+                call.cancel()
+
+    def start_drain(self, spider):
+        spider.draining = True
+        spider.deferred_links.clear()
+        self.crawler.stats.set_value('deadline/drain_pages_scraped', spider.pages_scraped)
+        spider.logger.info("Deadline near: discovery stopped, draining queued character pages")
+
+    def stop(self, spider):
+        self.crawler.stats.set_value('deadline/reached', True)
+        spider.logger.info("Deadline reached, closing the spider")
+        self.crawler.engine.close_spider(spider, 'deadline')
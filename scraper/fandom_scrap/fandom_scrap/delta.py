@@ -0,0 +1,124 @@
+"""
+Deltas versionnés entre deux snapshots `<fandom>_latest.json`.
+
+À chaque crawl, le nouveau snapshot est comparé au précédent (identité :
+`page_url`, contenu : sha256 des champs hors `scraped_at`). Le dossier
+`<fandom>_deltas/` à côté du snapshot contient :
+
+- `manifest.json` : version courante du snapshot et liste des deltas
+  disponibles (`from_version`, `to_version`, fichier, compteurs) ;
+- `v<N>.json` : le delta de la version N-1 à N, avec les fiches ajoutées et
+  modifiées complètes et les `page_url` supprimées.
+
+Un client qui détient la version N applique les deltas N+1, N+2... au lieu de
+retélécharger le snapshot ; s'il est trop en retard (deltas purgés), il
+recharge le snapshot complet.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+
+# Champs qui changent à chaque crawl sans que la fiche ait changé
+VOLATILE_FIELDS = ('scraped_at',)
+
+
+def content_hash(item):
+    """Empreinte du contenu d'une fiche, indépendante de la date de crawl"""
+    content = {key: value for key, value in dict(item).items() if key not in VOLATILE_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, default=dict)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def compute_delta(previous_items, current_items):
+    """(ajoutées, modifiées, page_url supprimées) entre deux listes de fiches"""
+    previous = {item.get('page_url'): content_hash(item) for item in previous_items}
+
+    added = []
+    changed = []
+    current_urls = set()
+    for item in current_items:
+        page_url = item.get('page_url')
+        current_urls.add(page_url)
+        if page_url not in previous:
+            added.append(item)
+        elif previous[page_url] != content_hash(item):
+            changed.append(item)
+
+    removed = [page_url for page_url in previous if page_url not in current_urls]
+    return added, changed, removed
+
+
+def load_snapshot(path):
+    """Fiches d'un snapshot `_latest.json` (liste vide s'il n'existe pas ou est illisible)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return items if isinstance(items, list) else []
+
+
+def _write_json(path, data):
+    """Écriture atomique : les lecteurs voient l'ancien ou le nouveau fichier"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'), default=dict)
+    os.replace(tmp_path, path)
+
+
+def write_delta(delta_dir, fandom_name, previous_items, current_items, keep_versions=20):
+    """Écrit le delta vers une nouvelle version et met à jour le manifest ; renvoie le manifest"""
+    os.makedirs(delta_dir, exist_ok=True)
+    manifest_path = os.path.join(delta_dir, 'manifest.json')
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        # Pas encore de manifest : un snapshot précédent compte comme version 1
+        manifest = {
+            'fandom_name': fandom_name,
+            'version': 1 if previous_items else 0,
+            'deltas': [],
+        }
+
+    version = manifest['version'] + 1
+    created_at = datetime.now().isoformat()
+
+    if manifest['version']:
+        added, changed, removed = compute_delta(previous_items, current_items)
+        filename = f"v{version}.json"
+        _write_json(os.path.join(delta_dir, filename), {
+            'fandom_name': fandom_name,
+            'from_version': version - 1,
+            'to_version': version,
+            'created_at': created_at,
+            'added': added,
+            'changed': changed,
+            'removed': removed,
+        })
+        manifest['deltas'].append({
+            'from_version': version - 1,
+            'to_version': version,
+            'file': filename,
+            'added': len(added),
+            'changed': len(changed),
+            'removed': len(removed),
+            'created_at': created_at,
+        })
+
+    # Purge des deltas les plus anciens
+    while len(manifest['deltas']) > keep_versions:
+        expired = manifest['deltas'].pop(0)
+        try:
+            os.remove(os.path.join(delta_dir, expired['file']))
+        except OSError:
+            pass
+
+    manifest['version'] = version
+    manifest['items'] = len(current_items)
+    manifest['updated_at'] = created_at
+    _write_json(manifest_path, manifest)
+    return manifest
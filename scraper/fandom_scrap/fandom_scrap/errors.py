@@ -0,0 +1,90 @@
+"""
+Agrégation bornée des erreurs de crawl.
+
+Au lieu d'une liste qui grossit à chaque échec, les erreurs sont regroupées
+par (type, statut HTTP, motif d'URL). Chaque groupe garde un compteur et au
+plus `max_samples` exemples ; au-delà de `max_groups` groupes, les nouvelles
+erreurs vont dans un groupe « other ». La mémoire reste donc constante.
+"""
+
+import re
+import time
+from collections import deque
+from datetime import datetime
+from urllib.parse import urlparse
+
+
+# /wiki/Category:Heroes -> /wiki/Category:*, /wiki/Luke -> /wiki/*
+_NAMESPACE_RE = re.compile(r'^(/wiki/[^/:]+:)')
+
+
+def url_pattern(url):
+    """Motif d'URL servant à regrouper les erreurs"""
+    path = urlparse(url).path or '/'
+    match = _NAMESPACE_RE.match(path)
+    if match:
+        return f"{match.group(1)}*"
+    if path.startswith('/wiki/'):
+        return '/wiki/*'
+    return path
+
+
+class ErrorAggregator:
+    def __init__(self, crawler=None, max_groups=100, max_samples=5):
+        # crawler.stats n'existe qu'à partir du démarrage du crawl : lu à la volée
+        self.crawler = crawler
+        self.max_groups = max_groups
+        self.max_samples = max_samples
+        self.groups = {}
+        self.total = 0
+        self.started = time.monotonic()
+
+    def __len__(self):
+        return self.total
+
+    def record(self, kind, url, message, status=None):
+        self.total += 1
+
+        key = (kind, status, url_pattern(url))
+        if key not in self.groups and len(self.groups) >= self.max_groups:
+            key = ('other', None, '*')
+
+        group = self.groups.get(key)
+        if group is None:
+            group = {
+                'count': 0,
+                'first_seen': datetime.now().isoformat(),
+                'samples': deque(maxlen=self.max_samples),
+            }
+            self.groups[key] = group
+        group['count'] += 1
+        group['last_seen'] = datetime.now().isoformat()
+        group['samples'].append({'url': url, 'message': message})
+
+        stats = getattr(self.crawler, 'stats', None) if self.crawler else None
+        if stats is not None:
+            stats.inc_value('errors/total')
+            stats.inc_value(f"errors/type/{kind}")
+            if status is not None:
+                stats.inc_value(f"errors/status/{status}")
+            stats.set_value('errors/per_minute', self.rate_per_minute())
+
+    def rate_per_minute(self):
+        elapsed = max(time.monotonic() - self.started, 1)
+        return round(self.total * 60 / elapsed, 2)
+
+    def summary(self):
+        """Groupes triés par nombre d'occurrences, pour le rapport JSON"""
+        groups = sorted(self.groups.items(), key=lambda entry: entry[1]['count'], reverse=True)
+        return [
+            {
+                'type': kind,
+                'status': status,
+                'url_pattern': pattern,
+                'count': group['count'],
+                'first_seen': group['first_seen'],
+                'last_seen': group['last_seen'],
+                'samples': list(group['samples']),
+            }
+            for (kind, status, pattern), group in groups
+        ]
@@ -0,0 +1,71 @@
+"""
+Pool de processus pour l'extraction HTML (option EXTRACTION_PROCESSES).
+
+Le corps brut de la réponse est envoyé à un worker, qui reconstruit une
+HtmlResponse et appelle `FandomSpider.extract_character`. Le worker renvoie
+un dict simple (ou None) et les sélecteurs gagnants, que le processus
+principal reporte dans son profil ; le réacteur ne fait plus que l'I/O.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from scrapy.http import HtmlResponse
+
+
+# Instance de spider allégée, propre à chaque worker
+_worker_spider = None
+
+
+def _init_worker(fandom_url, fandom_name, profile_path=None):
+    global _worker_spider
+    from fandom_scrap.profiles import SelectorProfile
+    from fandom_scrap.spiders.fandom_spider import FandomSpider
+
+    # Pas de __init__ : on ne veut ni charger les catégories ni générer d'URLs
+    spider = FandomSpider.__new__(FandomSpider)
+    spider.fandom_url = fandom_url
+    spider.fandom_name = fandom_name
+    # Copie du profil : les gains sont renvoyés avec chaque item, seul le
+    # processus principal enregistre le profil
+    if profile_path:
+        spider.selector_profile = SelectorProfile(profile_path, fandom_name)
+    _worker_spider = spider
+
+
+def _extract(url, body, encoding):
+    hits = []
+    if _worker_spider.selector_profile is not None:
+        _worker_spider.selector_profile.journal = hits
+    response = HtmlResponse(url=url, body=body, encoding=encoding)
+    item = _worker_spider.extract_character(response)
+    return (dict(item) if item is not None else None), hits
+
+
+class ExtractionPool:
+    def __init__(self, processes, max_inflight, fandom_url, fandom_name, profile_path=None):
+        # spawn : ne pas forker un processus dont le réacteur tourne
+        self.executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(fandom_url, fandom_name, profile_path),
+        )
+        self.max_inflight = max_inflight
+        self._semaphore = None
+
+    async def extract(self, response):
+        """(item ou None, [(champ, sélecteur gagnant)]) d'une réponse, extrait dans un worker
+
+        Au plus max_inflight extractions en cours.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_inflight)
+
+        async with self._semaphore:
+            future = self.executor.submit(_extract, response.url, response.body, response.encoding)
+            return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,173 @@
+"""
+Statistiques de facettes calculées en fin de crawl.
+
+`<fandom>_facets.json`, écrit à côté de `<fandom>_latest.json`, permet aux
+vues Explorer et comparateur du frontend d'afficher filtres et échelles sans
+parcourir tout le snapshot :
+
+- `facets` : effectifs par `character_type` et, pour chaque clé des
+  attributs `attribute_1`/`attribute_2` ("Clé: valeur"), par valeur ;
+- `infobox_coverage` : nombre et part des fiches ayant chaque clé d'infobox ;
+- `numeric` : min, max, moyenne et médiane de la taille (cm), du poids (kg)
+  et de l'âge (années), lus dans l'infobox et convertis en nombres.
+
+Tout est calculé en une seule passe sur les fiches ; seules les
+FACETS_MAX_VALUES valeurs (ou clés) les plus fréquentes sont gardées.
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from datetime import datetime
+
+
+# Champ numérique -> (clés d'infobox reconnues, unités vers l'unité de référence)
+NUMERIC_FIELDS = {
+    'height': (
+        ('height', 'taille'),
+        {'cm': 1, 'mm': 0.1, 'm': 100, 'km': 100000, 'ft': 30.48, 'feet': 30.48,
+         'foot': 30.48, 'in': 2.54, 'inch': 2.54, 'inches': 2.54},
+    ),
+    'weight': (
+        ('weight', 'poids', 'mass'),
+        {'kg': 1, 'g': 0.001, 't': 1000, 'tons': 1000, 'lb': 0.45359237,
+         'lbs': 0.45359237, 'pounds': 0.45359237},
+    ),
+    'age': (
+        ('age', 'âge'),
+        {'years': 1, 'year': 1, 'ans': 1, 'an': 1, 'yo': 1},
+    ),
+}
+
+NUMERIC_UNITS = {'height': 'cm', 'weight': 'kg', 'age': 'years'}
+
+# Premier nombre de la valeur (séparateurs de milliers et virgule décimale acceptés)
+_QUANTITY = re.compile(r"(\d{1,3}(?:[ ,]\d{3})+(?!\d)|\d+(?:[.,]\d+)?)\s*([a-zA-Zéû]+)?")
+# 5'9", 5 ft 9 in, 5′9″
+_FEET_INCHES = re.compile(r"(\d+)\s*(?:'|′|ft|feet|foot)\s*(\d+(?:\.\d+)?)\s*(?:\"|″|in|inch|inches)?")
+
+
+def _to_float(number):
+    if re.fullmatch(r"\d{1,3}(?:[ ,]\d{3})+", number):
+        return float(number.replace(',', '').replace(' ', ''))
+    return float(number.replace(',', '.'))
+
+
+def parse_quantity(field, text):
+    """Valeur de `text` dans l'unité de référence de `field`, ou None"""
+    if not text:
+        return None
+    units = NUMERIC_FIELDS[field][1]
+
+    match = _QUANTITY.search(text)
+    if not match:
+        return None
+
+    # Seule la première mesure compte : "180 cm (5'11")" reste en centimètres
+    if field == 'height':
+        feet = _FEET_INCHES.match(text, match.start())
+        if feet:
+            return float(feet.group(1)) * 30.48 + float(feet.group(2)) * 2.54
+
+    value = _to_float(match.group(1))
+    unit = (match.group(2) or '').lower()
+    if unit in units:
+        return value * units[unit]
+    # Sans unité reconnue : la valeur est supposée dans l'unité de référence
+    return value
+
+
+def _split_attribute(attribute):
+    """("Clé", "valeur") d'un attribut "Clé: valeur", ou None"""
+    if not attribute or ': ' not in attribute:
+        return None
+    key, value = attribute.split(': ', 1)
+    return key.strip().lower(), value.strip()
+
+
+def _top(counter, max_values):
+    return [[value, count] for value, count in counter.most_common(max_values)]
+
+
+def _summary(values):
+    if not values:
+        return None
+    values.sort()
+    middle = len(values) // 2
+    median = values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+    return {
+        'count': len(values),
+        'min': round(values[0], 2),
+        'max': round(values[-1], 2),
+        'mean': round(sum(values) / len(values), 2),
+        'median': round(median, 2),
+    }
+
+
+def compute_facets(items, max_values=50):
+    """Facettes, couverture des clés d'infobox et plages numériques des fiches"""
+    types = Counter()
+    attributes = {}
+    coverage = Counter()
+    numeric = {field: [] for field in NUMERIC_FIELDS}
+
+    for item in items:
+        types[item.get('character_type') or ''] += 1
+
+        for field in ('attribute_1', 'attribute_2'):
+            attribute = _split_attribute(item.get(field))
+            if attribute:
+                attributes.setdefault(attribute[0], Counter())[attribute[1]] += 1
+
+        infobox = item.get('infobox_data') or {}
+        coverage.update(infobox.keys())
+        for field, (keys, _units) in NUMERIC_FIELDS.items():
+            for key in keys:
+                if key in infobox:
+                    value = parse_quantity(field, infobox[key])
+                    if value is not None:
+                        numeric[field].append(value)
+                    break
+
+    total = len(items)
+    missing_type = types.pop('', 0)
+    return {
+        'items_count': total,
+        'facets': {
+            'character_type': {
+                'distinct': len(types),
+                'missing': missing_type,
+                'values': _top(types, max_values),
+            },
+            'attributes': {
+                key: {
+                    'count': sum(values.values()),
+                    'distinct': len(values),
+                    'values': _top(values, max_values),
+                }
+                for key, values in sorted(attributes.items(), key=lambda kv: -sum(kv[1].values()))
+            },
+        },
+        'infobox_coverage': {
+            key: {'count': count, 'ratio': round(count / total, 4)}
+            for key, count in coverage.most_common(max_values)
+        },
+        'numeric': {
+            field: dict(summary, unit=NUMERIC_UNITS[field])
+            for field, summary in ((field, _summary(values)) for field, values in numeric.items())
+            if summary
+        },
+    }
+
+
+def write_facets(path, fandom_name, facets):
+    """Écriture atomique de `<fandom>_facets.json`"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(
+            dict(fandom_name=fandom_name, generated_at=datetime.now().isoformat(), **facets),
+            f, ensure_ascii=False, separators=(',', ':'),
+        )
+    os.replace(tmp_path, path)
@@ -0,0 +1,387 @@
+"""
+Frontière de crawl partagée entre plusieurs processus / machines.
+
+`SharedFrontierScheduler` remplace le scheduler Scrapy : les requêtes, les
+empreintes déjà vues, le compteur global de pages et les items sont stockés
+dans un backend commun (FRONTIER_URL) :
+
+- `sqlite:///chemin/frontier.db` : plusieurs processus sur une même machine ;
+- `redis://hote:port/0` : plusieurs machines (tout serveur parlant le
+  protocole Redis convient, nécessite le paquet `redis`).
+
+Chaque requête sortie de la file est « louée » à un worker pendant
+FRONTIER_LEASE_SECONDS. Si le worker disparaît sans la terminer, la location
+expire et la requête est redistribuée (au plus FRONTIER_MAX_ATTEMPTS fois).
+
+Les requêtes sont stockées en JSON (`Request.to_dict`, octets en base64) :
+le backend peut être partagé ou distant, il ne doit pas pouvoir faire
+exécuter du code aux workers comme le permettrait pickle.
+"""
+
+import base64
+import json
+import os
+import socket
+import sqlite3
+import time
+from urllib.parse import urlparse
+
+from scrapy import signals
+from scrapy.utils.request import request_from_dict
+
+try:
+    import redis
+except ImportError:  # backend Redis optionnel
+    redis = None
+
+
+def _to_json(value):
+    """Valeur JSON d'un `Request.to_dict` (octets et clés d'en-têtes en octets balisés)"""
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value):
+            return {key: _to_json(item) for key, item in value.items()}
+        return {'__items__': [[_to_json(key), _to_json(item)] for key, item in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    return value
+
+
+def _from_json(obj):
+    if len(obj) == 1 and '__bytes__' in obj:
+        return base64.b64decode(obj['__bytes__'])
+    if len(obj) == 1 and '__items__' in obj:
+        return {key: item for key, item in obj['__items__']}
+    return obj
+
+
+def dump_request(data):
+    """Sérialise un `Request.to_dict` pour la frontière"""
+    return json.dumps(_to_json(data), ensure_ascii=False, separators=(',', ':'))
+
+
+def load_request(payload):
+    """Inverse de dump_request (payload str ou bytes)"""
+    return json.loads(payload, object_hook=_from_json)
+
+
+class SqliteFrontier:
+    """Frontière partagée dans une base SQLite (une seule machine)"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS frontier_requests (
+        frontier TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        priority INTEGER NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        leased_by TEXT,
+        lease_expires REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (frontier, fingerprint)
+    );
+    CREATE INDEX IF NOT EXISTS idx_frontier_requests_queue
+        ON frontier_requests (frontier, status, priority);
+    CREATE TABLE IF NOT EXISTS frontier_counters (
+        frontier TEXT NOT NULL,
+        name TEXT NOT NULL,
+        value INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (frontier, name)
+    );
+    CREATE TABLE IF NOT EXISTS frontier_items (
+        frontier TEXT NOT NULL,
+        page_url TEXT NOT NULL,
+        data TEXT NOT NULL,
+        PRIMARY KEY (frontier, page_url)
+    );
+    """
+
+    def __init__(self, path, name):
+        self.name = name
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def push(self, fingerprint, priority, payload, dont_filter=False):
+        """Ajoute une requête ; False si elle a déjà été vue"""
+        if dont_filter:
+            self.conn.execute(
+                "INSERT INTO frontier_requests (frontier, fingerprint, priority, payload) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (frontier, fingerprint) DO UPDATE SET "
+                "status = 'pending', priority = excluded.priority, payload = excluded.payload, attempts = 0",
+                (self.name, fingerprint, priority, payload),
+            )
+            return True
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO frontier_requests (frontier, fingerprint, priority, payload) "
+            "VALUES (?, ?, ?, ?)",
+            (self.name, fingerprint, priority, payload),
+        )
+        return cursor.rowcount == 1
+
+    def lease(self, worker, lease_seconds, max_attempts):
+        """Loue la requête la plus prioritaire ; (fingerprint, payload) ou None"""
+        now = time.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Locations expirées ayant épuisé leurs tentatives : abandonnées
+            self.conn.execute(
+                "UPDATE frontier_requests SET status = 'done' WHERE frontier = ? "
+                "AND status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (self.name, now, max_attempts),
+            )
+            row = self.conn.execute(
+                "SELECT fingerprint, payload FROM frontier_requests WHERE frontier = ? "
+                "AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                "ORDER BY priority DESC LIMIT 1",
+                (self.name, now),
+            ).fetchone()
+            if row:
+                self.conn.execute(
+                    "UPDATE frontier_requests SET status = 'leased', leased_by = ?, "
+                    "lease_expires = ?, attempts = attempts + 1 "
+                    "WHERE frontier = ? AND fingerprint = ?",
+                    (worker, now + lease_seconds, self.name, row[0]),
+                )
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return (row[0], row[1]) if row else None
+
+    def ack(self, fingerprint):
+        self.conn.execute(
+            "UPDATE frontier_requests SET status = 'done', payload = '' "
+            "WHERE frontier = ? AND fingerprint = ?",
+            (self.name, fingerprint),
+        )
+
+    def pending(self):
+        """Nombre de requêtes en attente ou louées (par n'importe quel worker)"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM frontier_requests WHERE frontier = ? "
+            "AND status IN ('pending', 'leased')",
+            (self.name,),
+        ).fetchone()[0]
+
+    def incr_pages(self):
+        """Incrémente le compteur global de pages et renvoie la nouvelle valeur"""
+        self.conn.execute(
+            "INSERT INTO frontier_counters (frontier, name, value) VALUES (?, 'pages', 1) "
+            "ON CONFLICT (frontier, name) DO UPDATE SET value = value + 1",
+            (self.name,),
+        )
+        return self.pages()
+
+    def pages(self):
+        row = self.conn.execute(
+            "SELECT value FROM frontier_counters WHERE frontier = ? AND name = 'pages'",
+            (self.name,),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def add_item(self, item):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO frontier_items (frontier, page_url, data) VALUES (?, ?, ?)",
+            (self.name, item.get('page_url'), json.dumps(item, ensure_ascii=False)),
+        )
+
+    def items(self):
+        rows = self.conn.execute(
+            "SELECT data FROM frontier_items WHERE frontier = ?", (self.name,)
+        )
+        return [json.loads(row[0]) for row in rows]
+
+
+# KEYS : queue, leases, attempts, priorities, requests
+# ARGV : maintenant, tentatives max, expiration de la nouvelle location
+LEASE_SCRIPT = """
+for _, fingerprint in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])) do
+    redis.call('ZREM', KEYS[2], fingerprint)
+    if tonumber(redis.call('HGET', KEYS[3], fingerprint) or '0') >= tonumber(ARGV[2]) then
+        redis.call('HDEL', KEYS[5], fingerprint)
+        redis.call('HDEL', KEYS[4], fingerprint)
+        redis.call('HDEL', KEYS[3], fingerprint)
+    else
+        local priority = tonumber(redis.call('HGET', KEYS[4], fingerprint) or '0')
+        redis.call('ZADD', KEYS[1], -priority, fingerprint)
+    end
+end
+
+-- Les empreintes sans requête (déjà acquittées) sont sautées
+while true do
+    local popped = redis.call('ZPOPMIN', KEYS[1])
+    if #popped == 0 then
+        return false
+    end
+    local fingerprint = popped[1]
+    local payload = redis.call('HGET', KEYS[5], fingerprint)
+    if payload then
+        redis.call('ZADD', KEYS[2], ARGV[3], fingerprint)
+        redis.call('HINCRBY', KEYS[3], fingerprint, 1)
+        return {fingerprint, payload}
+    end
+end
+"""
+
+
+class RedisFrontier:
+    """Frontière partagée sur un serveur Redis (plusieurs machines)"""
+
+    def __init__(self, url, name):
+        if redis is None:
+            raise RuntimeError("The redis package is required for redis:// frontiers")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = f"frontier:{name}"
+        self.lease_script = self.client.register_script(LEASE_SCRIPT)
+
+    def key(self, suffix):
+        return f"{self.prefix}:{suffix}"
+
+    def close(self):
+        self.client.close()
+
+    def push(self, fingerprint, priority, payload, dont_filter=False):
+        if not self.client.sadd(self.key('seen'), fingerprint) and not dont_filter:
+            return False
+        pipe = self.client.pipeline()
+        pipe.hset(self.key('requests'), fingerprint, payload)
+        pipe.hset(self.key('priorities'), fingerprint, priority)
+        pipe.hdel(self.key('attempts'), fingerprint)
+        # ZPOPMIN sort le plus petit score : score = -priorité
+        pipe.zadd(self.key('queue'), {fingerprint: -priority})
+        pipe.execute()
+        return True
+
+    def lease(self, worker, lease_seconds, max_attempts):
+        """Remet en file les locations expirées puis loue la requête la plus prioritaire
+
+        Tout se fait dans un seul script Lua, exécuté atomiquement par le
+        serveur : une requête sortie de la file est toujours dans `leases`,
+        même si le worker meurt juste après.
+        """
+        now = time.time()
+        leased = self.lease_script(
+            keys=[self.key(name) for name in ('queue', 'leases', 'attempts', 'priorities', 'requests')],
+            args=[now, max_attempts, now + lease_seconds],
+        )
+        if not leased:
+            return None
+        fingerprint, payload = leased
+        return fingerprint.decode(), payload
+
+    def ack(self, fingerprint):
+        pipe = self.client.pipeline()
+        pipe.zrem(self.key('leases'), fingerprint)
+        pipe.hdel(self.key('requests'), fingerprint)
+        pipe.hdel(self.key('priorities'), fingerprint)
+        pipe.hdel(self.key('attempts'), fingerprint)
+        pipe.execute()
+
+    def pending(self):
+        return self.client.zcard(self.key('queue')) + self.client.zcard(self.key('leases'))
+
+    def incr_pages(self):
+        return self.client.incr(self.key('pages'))
+
+    def pages(self):
+        return int(self.client.get(self.key('pages')) or 0)
+
+    def add_item(self, item):
+        self.client.hset(
+            self.key('items'), item.get('page_url'), json.dumps(item, ensure_ascii=False)
+        )
+
+    def items(self):
+        return [json.loads(data) for data in self.client.hvals(self.key('items'))]
+
+
+def open_frontier(url, name):
+    """Ouvre le backend correspondant à FRONTIER_URL"""
+    parsed = urlparse(url)
+    if parsed.scheme == 'sqlite':
+        path = url[len('sqlite:///'):] if url.startswith('sqlite:///') else parsed.path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        return SqliteFrontier(path, name)
+    if parsed.scheme in ('redis', 'rediss', 'unix'):
+        return RedisFrontier(url, name)
+    raise ValueError(f"Unsupported FRONTIER_URL: {url}")
+
+
+class SharedFrontierScheduler:
+    """Scheduler Scrapy adossé à une frontière partagée"""
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        self.crawler = crawler
+        self.url = settings.get('FRONTIER_URL')
+        self.lease_seconds = settings.getint('FRONTIER_LEASE_SECONDS', 300)
+        self.max_attempts = settings.getint('FRONTIER_MAX_ATTEMPTS', 3)
+        self.worker = f"{socket.gethostname()}-{os.getpid()}"
+        self.frontier = None
+        self.spider = None
+
+        if not self.url:
+            raise ValueError("FRONTIER_URL must be set to use SharedFrontierScheduler")
+
+        crawler.signals.connect(self.request_left_downloader, signal=signals.request_left_downloader)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def open(self, spider):
+        self.spider = spider
+        name = self.crawler.settings.get('FRONTIER_NAME') or spider.fandom_name
+        self.frontier = open_frontier(self.url, name)
+        spider.frontier = self.frontier
+        spider.logger.info(f"Shared frontier {self.url} ({name}), worker {self.worker}")
+
+    def close(self, reason):
+        if self.frontier:
+            self.frontier.close()
+
+    def has_pending_requests(self):
+        # Tant qu'un autre worker a des locations en cours, on attend :
+        # elles peuvent expirer et revenir dans la file
+        return self.frontier.pending() > 0
+
+    def __len__(self):
+        # Taille globale de la file (tous workers), lue par la contre-pression mémoire
+        return self.frontier.pending() if self.frontier else 0
+
+    def enqueue_request(self, request):
+        fingerprint = self.crawler.request_fingerprinter.fingerprint(request).hex()
+        payload = dump_request(request.to_dict(spider=self.spider))
+        added = self.frontier.push(fingerprint, request.priority, payload, request.dont_filter)
+        if not added:
+            self.crawler.stats.inc_value('frontier/filtered', spider=self.spider)
+            return False
+        self.crawler.stats.inc_value('frontier/enqueued', spider=self.spider)
+        return True
+
+    def next_request(self):
+        leased = self.frontier.lease(self.worker, self.lease_seconds, self.max_attempts)
+        if leased is None:
+            return None
+        fingerprint, payload = leased
+        try:
+            request = request_from_dict(load_request(payload), spider=self.spider)
+        except (ValueError, TypeError, KeyError) as e:
+            # Entrée illisible (ancien format pickle, donnée corrompue) : abandonnée
+            self.spider.logger.warning(f"Dropping unreadable frontier request {fingerprint}: {e}")
+            self.crawler.stats.inc_value('frontier/invalid', spider=self.spider)
+            self.frontier.ack(fingerprint)
+            return None
+        request.meta['frontier_fingerprint'] = fingerprint
+        self.crawler.stats.inc_value('frontier/leased', spider=self.spider)
+        return request
+
+    def request_left_downloader(self, request, spider):
+        fingerprint = request.meta.get('frontier_fingerprint')
+        if fingerprint:
+            self.frontier.ack(fingerprint)
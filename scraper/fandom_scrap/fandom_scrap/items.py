@@ -3,6 +3,9 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
 
+import sys
+from dataclasses import dataclass
+
 import scrapy
 
 
@@ -27,3 +30,90 @@ class FandomCharacterItem(scrapy.Item):
     additional_images = scrapy.Field()
     categories = scrapy.Field()
     infobox_data = scrapy.Field()
+
+
+# Ordre des champs dans les fichiers JSON produits
+CHARACTER_FIELDS = (
+    'fandom_url', 'fandom_name', 'page_url', 'scraped_at', 'name', 'image_url',
+    'description', 'character_type', 'infobox_data', 'attribute_1', 'attribute_2',
+    'categories', 'additional_images',
+)
+
+# Les valeurs plus longues (descriptions...) ne se répètent pas : pas d'intern
+INTERN_MAX_LENGTH = 64
+
+
+def _intern(value):
+    if isinstance(value, str) and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+@dataclass
+class CompactCharacterItem:
+    """Version compacte de FandomCharacterItem (option COMPACT_ITEMS).
+
+    Objet à slots au lieu d'un dict, listes stockées en tuples, et chaînes
+    répétées d'une page à l'autre (fandom, catégories, clés et valeurs
+    courtes d'infobox, type, attributs) internées : une seule copie en
+    mémoire. `to_dict()` redonne exactement le schéma JSON habituel.
+    """
+
+    __slots__ = CHARACTER_FIELDS
+
+    fandom_url: str
+    fandom_name: str
+    page_url: str
+    scraped_at: str
+    name: str
+    image_url: str
+    description: str
+    character_type: str
+    infobox_data: dict
+    attribute_1: str
+    attribute_2: str
+    categories: tuple
+    additional_images: tuple
+
+    @classmethod
+    def from_mapping(cls, data):
+        infobox = data.get('infobox_data')
+        categories = data.get('categories')
+        additional_images = data.get('additional_images')
+        return cls(
+            fandom_url=_intern(data.get('fandom_url')),
+            fandom_name=_intern(data.get('fandom_name')),
+            page_url=data.get('page_url'),
+            scraped_at=data.get('scraped_at'),
+            name=data.get('name'),
+            image_url=data.get('image_url'),
+            description=data.get('description'),
+            character_type=_intern(data.get('character_type')),
+            infobox_data=(
+                {_intern(key): _intern(value) for key, value in infobox.items()}
+                if infobox is not None else None
+            ),
+            attribute_1=_intern(data.get('attribute_1')),
+            attribute_2=_intern(data.get('attribute_2')),
+            categories=tuple(_intern(c) for c in categories) if categories is not None else None,
+            additional_images=tuple(additional_images) if additional_images is not None else None,
+        )
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in CHARACTER_FIELDS}
+        for field in ('categories', 'additional_images'):
+            if data[field] is not None:
+                data[field] = list(data[field])
+        if data['infobox_data'] is not None:
+            data['infobox_data'] = dict(data['infobox_data'])
+        return data
+
+    # Accès façon dict, pour les consommateurs de `JsonWriterPipeline.items`
+    def keys(self):
+        return CHARACTER_FIELDS
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
@@ -4,6 +4,7 @@
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
 from scrapy import signals
+from scrapy.downloadermiddlewares.httpcompression import ACCEPTED_ENCODINGS
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
@@ -98,3 +99,50 @@ class FandomScrapDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class TransportStatsMiddleware:
+    """Statistiques de transport par réponse : protocole, encodage, octets reçus.
+
+    Placé juste avant HttpCompressionMiddleware (590), il voit les corps encore
+    compressés : `transport/bytes_on_wire` est comparable à
+    `httpcompression/response_bytes` (après décompression). En mode HTTP/2,
+    il annonce aussi br/zstd et retire l'en-tête Connection (interdit en h2).
+    """
+
+    def __init__(self, stats, http2_enabled):
+        self.stats = stats
+        self.http2_enabled = http2_enabled
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        s = cls(crawler.stats, crawler.settings.getbool('HTTP2_ENABLED'))
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def process_request(self, request, spider):
+        if self.http2_enabled:
+            request.headers['Accept-Encoding'] = b", ".join(ACCEPTED_ENCODINGS)
+            request.headers.pop('Connection', None)
+        return None
+
+    def process_response(self, request, response, spider):
+        encoding = response.headers.get('Content-Encoding', b'identity').decode('latin-1')
+        self.stats.inc_value(f"transport/responses/{response.protocol or 'unknown'}")
+        self.stats.inc_value(f"transport/content_encoding/{encoding}")
+        self.stats.inc_value('transport/bytes_on_wire', len(response.body))
+        return response
+
+    def spider_closed(self, spider):
+        opened = self.stats.get_value('transport/connections_opened')
+        responses = sum(
+            value for key, value in self.stats.get_stats().items()
+            if key.startswith('transport/responses/')
+        )
+        if opened:
+            self.stats.set_value('transport/requests_per_connection', round(responses / opened, 1))
+        spider.logger.info(
+            f"Transport: {responses} responses, "
+            f"{self.stats.get_value('transport/bytes_on_wire', 0)} bytes on wire, "
+            f"{opened or 'n/a'} connections opened"
+        )
@@ -0,0 +1,82 @@
+"""
+Classement des liens par namespace MediaWiki.
+
+Seules les pages du namespace principal (articles) sont des fiches. Les noms
+des autres namespaces sont traduits selon la langue du wiki (`Catégorie:`,
+`Kategorie:`...) : la liste est lue une fois via l'API siteinfo
+(`siprop=namespaces|namespacealiases`) ou donnée par WIKI_NAMESPACES, puis
+réunie aux noms anglais canoniques : une expression régulière compilée isole
+le titre, dont le préfixe est cherché dans un ensemble.
+"""
+
+import re
+from urllib.parse import quote, urlparse
+
+
+# Noms anglais (canoniques ou propres à Fandom), toujours exclus
+DEFAULT_NAMESPACES = (
+    'Media', 'Special', 'Talk', 'User', 'User talk', 'Project', 'Project talk',
+    'File', 'File talk', 'Image', 'Image talk', 'MediaWiki', 'MediaWiki talk',
+    'Template', 'Template talk', 'Help', 'Help talk', 'Category', 'Category talk',
+    'Forum', 'Forum talk', 'Module', 'Module talk', 'Message Wall', 'Message Wall Greeting',
+    'Thread', 'Board', 'Board Thread', 'Topic', 'Blog', 'User blog', 'User blog comment',
+    'Map', 'Map talk', 'GeoJson', 'GeoJson talk', 'Gadget', 'Gadget definition',
+)
+
+SITEINFO_NAMESPACES_QUERY = 'siprop=namespaces|namespacealiases'
+
+
+def siteinfo_namespaces(data):
+    """Noms (et alias) des namespaces autres que le principal, depuis la réponse siteinfo"""
+    query = data.get('query', {})
+    names = []
+    for namespace in query.get('namespaces', {}).values():
+        if namespace.get('id') == 0:
+            continue
+        names.extend(
+            name for name in (namespace.get('*') or namespace.get('name'), namespace.get('canonical'))
+            if name
+        )
+    for alias in query.get('namespacealiases', []):
+        if alias.get('id') != 0 and alias.get('*'):
+            names.append(alias['*'])
+    return names
+
+
+def _url_forms(name):
+    """Formes d'un nom de namespace dans une URL (espaces en _, éventuellement encodé)"""
+    title = name.strip().replace(' ', '_').lower()
+    return {title, quote(title).lower()}
+
+
+class LinkClassifier:
+    """Reconnaît les liens vers un article du wiki (namespace principal)"""
+
+    def __init__(self, fandom_url, namespaces=()):
+        parsed = urlparse(fandom_url)
+        # Wikis par langue : https://<fandom>.fandom.com/fr/wiki/...
+        base_path = parsed.path.rstrip('/')
+
+        self.namespaces = frozenset().union(
+            *(_url_forms(name) for name in (*DEFAULT_NAMESPACES, *namespaces))
+        )
+        self.namespace_count = len(set(DEFAULT_NAMESPACES) | set(namespaces))
+
+        # Hôte avec son port éventuel (wikis locaux, http://localhost:8765)
+        host = re.escape(parsed.hostname or '')
+        if parsed.port:
+            host += re.escape(f':{parsed.port}')
+
+        # Lien vers une page du wiki, sans ancre ni paramètres ; le titre est capturé
+        self.pattern = re.compile(
+            rf'^(?:(?:https?:)?//{host})?{re.escape(base_path)}/wiki/([^?#]+)$',
+            re.IGNORECASE,
+        )
+
+    def is_article(self, link):
+        """Vrai pour un lien /wiki/<Titre> du wiki, hors namespaces, ancres et paramètres"""
+        match = self.pattern.match(link) if link else None
+        if match is None:
+            return False
+        prefix, colon, _ = match.group(1).partition(':')
+        return not colon or prefix.lower() not in self.namespaces
@@ -3,46 +3,254 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import hashlib
 import json
 import os
+import shutil
+import time
 from datetime import datetime
 from itemadapter import ItemAdapter
+from scrapy.exceptions import NotConfigured
+
+from fandom_scrap.delta import load_snapshot, write_delta
+from fandom_scrap.facets import compute_facets, write_facets
+from fandom_scrap.items import CompactCharacterItem
+from fandom_scrap.search_index import write_search_index
+from fandom_scrap.storage import CharacterStore
+from fandom_scrap.writer import BackgroundWriter
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # export Parquet optionnel
+    pa = None
+    pq = None
 
 
 class JsonWriterPipeline:
     def __init__(self):
-        self.items_file = None
+        self.filename = None
         self.items = []
+        self.journal = None
+        self.journal_path = None
+        self.journal_buffer = []
+        self.journal_batch_size = 50
+        self.compact = False
+        self.background = None
+        # Snapshots partiels (<fandom>_partial.json) publiés pendant le crawl
+        self.partial_enabled = False
+        self.partial_items = 50
+        self.partial_interval = 10.0
+        self.partial_growth = 0.25
+        self.partial_max_interval = 60.0
+        self.partial_count = 0
+        self.partial_time = None
+        self.partial_pending = False
+    
+    def make_record(self, data):
+        """Item stocké en mémoire jusqu'à la fin du crawl (compact ou dict)"""
+        if self.compact:
+            return CompactCharacterItem.from_mapping(data)
+        return dict(data)
     
     def open_spider(self, spider):
+        # Nom du fichier basé sur le fandom et timestamp
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.filename = f"../data/{spider.fandom_name}_{timestamp}.json"
+        spider.logger.info(f"Saving items to {self.filename}")
+        
+        self.compact = spider.settings.getbool('COMPACT_ITEMS', True)
+        self.journal_batch_size = spider.settings.getint('JOURNAL_BATCH_SIZE', 50)
+        self.partial_enabled = spider.settings.getbool('PARTIAL_SNAPSHOTS_ENABLED', True)
+        self.partial_items = spider.settings.getint('PARTIAL_SNAPSHOT_ITEMS', 50)
+        self.partial_interval = spider.settings.getfloat('PARTIAL_SNAPSHOT_INTERVAL', 10.0)
+        self.partial_growth = spider.settings.getfloat('PARTIAL_SNAPSHOT_GROWTH', 0.25)
+        self.partial_max_interval = spider.settings.getfloat('PARTIAL_SNAPSHOT_MAX_INTERVAL', 60.0)
+        self.background = BackgroundWriter('JsonWriterPipeline', spider.settings.getint('WRITER_QUEUE_SIZE', 100))
+        
+        # Reprise de crawl : les items déjà écrits sont journalisés dans JOBDIR
+        jobdir = spider.settings.get('JOBDIR')
+        if jobdir:
+            self.journal_path = os.path.join(jobdir, 'items.jsonl')
+        
+        return self.background.submit(self.prepare_output, spider)
+    
+    def prepare_output(self, spider):
+        """(Thread d'écriture) Dossiers de sortie et relecture du journal de reprise"""
         # Créer les dossiers s'ils n'existent pas
         os.makedirs('../data', exist_ok=True)
         os.makedirs('../../frontend/public/data', exist_ok=True)
         
-        # Nom du fichier basé sur le fandom et timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"../data/{spider.fandom_name}_{timestamp}.json"
-        self.items_file = open(filename, 'w', encoding='utf-8')
-        spider.logger.info(f"Saving items to {filename}")
+        if self.journal_path:
+            if os.path.exists(self.journal_path):
+                with open(self.journal_path, 'r', encoding='utf-8') as f:
+                    self.items = [self.make_record(json.loads(line)) for line in f if line.strip()]
+                spider.logger.info(f"Resumed {len(self.items)} items from {self.journal_path}")
+            self.journal = open(self.journal_path, 'a', encoding='utf-8')
     
     def close_spider(self, spider):
+        self.flush_journal(spider)
+        
+        # Frontière partagée : "latest" contient les items de tous les workers
+        # (lus ici, la connexion à la frontière appartient au thread du réacteur)
+        merged_items = None
+        frontier = getattr(spider, 'frontier', None)
+        if frontier:
+            merged_items = frontier.items()
+            spider.logger.info(f"Merged {len(merged_items)} items from the shared frontier")
+        
+        self.background.submit_logged(spider, self.write_outputs, spider, merged_items)
+        return self.background.stop()
+    
+    def write_outputs(self, spider, merged_items):
+        """(Thread d'écriture) Fichier horodaté, "latest", copie frontend, index de recherche et facettes"""
+        if self.journal:
+            self.journal.close()
+        
         # Sauvegarder tous les items dans le dossier data principal
-        json.dump(self.items, self.items_file, indent=2, ensure_ascii=False)
-        self.items_file.close()
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            json.dump(self.items, f, indent=2, ensure_ascii=False, default=dict)
+        
+        if merged_items is not None:
+            self.items = merged_items
+        
+        # Deltas : l'ancien "latest" est relu avant d'être remplacé
+        delta_enabled = spider.settings.getbool('DELTA_ENABLED', True)
         
         # Créer le fichier "latest" pour le scraper
         latest_filename = f"../data/{spider.fandom_name}_latest.json"
+        previous_items = load_snapshot(latest_filename) if delta_enabled else None
         with open(latest_filename, 'w', encoding='utf-8') as f:
-            json.dump(self.items, f, indent=2, ensure_ascii=False)
+            json.dump(self.items, f, indent=2, ensure_ascii=False, default=dict)
+        if delta_enabled:
+            self.save_delta(spider, '../data', previous_items)
         
         # NOUVEAU : Copier aussi dans le frontend pour accès direct
         frontend_filename = f"../../frontend/public/data/{spider.fandom_name}_latest.json"
         try:
+            previous_items = load_snapshot(frontend_filename) if delta_enabled else None
             with open(frontend_filename, 'w', encoding='utf-8') as f:
-                json.dump(self.items, f, indent=2, ensure_ascii=False)
+                json.dump(self.items, f, indent=2, ensure_ascii=False, default=dict)
             spider.logger.info(f"Data also saved to frontend: {frontend_filename}")
+            if delta_enabled:
+                self.save_delta(spider, '../../frontend/public/data', previous_items)
         except Exception as e:
             spider.logger.warning(f"Could not save to frontend: {e}")
+        
+        # Les lecteurs des snapshots partiels basculent sur "latest"
+        if self.partial_enabled:
+            self.write_partial(spider, {
+                'complete': True,
+                'items_count': len(self.items),
+                'updated_at': datetime.now().isoformat(),
+                'snapshot': os.path.basename(latest_filename),
+            })
+        
+        # Index de recherche + shards pour l'autocomplétion du frontend
+        if spider.settings.getbool('SEARCH_INDEX_ENABLED', True):
+            shard_size = spider.settings.getint('SEARCH_INDEX_SHARD_SIZE', 200)
+            for data_dir in ('../data', '../../frontend/public/data'):
+                index_dir = f"{data_dir}/{spider.fandom_name}_search"
+                try:
+                    write_search_index(self.items, index_dir, shard_size)
+                    spider.logger.info(f"Search index saved to {index_dir}")
+                except Exception as e:
+                    spider.logger.warning(f"Could not save search index to {index_dir}: {e}")
+        
+        # Facettes et plages numériques pour les filtres et le comparateur
+        if spider.settings.getbool('FACETS_ENABLED', True):
+            facets = compute_facets(self.items, spider.settings.getint('FACETS_MAX_VALUES', 50))
+            for data_dir in ('../data', '../../frontend/public/data'):
+                facets_filename = f"{data_dir}/{spider.fandom_name}_facets.json"
+                try:
+                    write_facets(facets_filename, spider.fandom_name, facets)
+                    spider.logger.info(f"Facets saved to {facets_filename}")
+                except Exception as e:
+                    spider.logger.warning(f"Could not save facets to {facets_filename}: {e}")
+    
+    def save_delta(self, spider, data_dir, previous_items):
+        """Delta versionné entre l'ancien et le nouveau "latest" de `data_dir`"""
+        delta_dir = f"{data_dir}/{spider.fandom_name}_deltas"
+        try:
+            manifest = write_delta(
+                delta_dir, spider.fandom_name, previous_items, self.items,
+                keep_versions=spider.settings.getint('DELTA_KEEP_VERSIONS', 20),
+            )
+        except Exception as e:
+            spider.logger.warning(f"Could not save delta to {delta_dir}: {e}")
+            return
+        
+        delta = manifest['deltas'][-1] if manifest['deltas'] else None
+        if delta and delta['to_version'] == manifest['version']:
+            spider.logger.info(
+                f"Snapshot v{manifest['version']} in {delta_dir}: {delta['added']} added, "
+                f"{delta['changed']} changed, {delta['removed']} removed"
+            )
+        else:
+            spider.logger.info(f"Snapshot v{manifest['version']} in {delta_dir} (no previous snapshot)")
+    
+    def maybe_publish_partial(self, spider):
+        """Publie un snapshot partiel (le premier dès le premier item)
+
+        Ensuite, au plus un toutes les T secondes, et seulement quand le nombre
+        d'items a crû d'au moins N et d'une fraction PARTIAL_SNAPSHOT_GROWTH du
+        dernier snapshot : chaque snapshot réécrit toute la liste, leurs
+        tailles croissent géométriquement et le coût total reste linéaire.
+        Un crawl lent mettrait longtemps à gagner cette fraction : passé
+        PARTIAL_SNAPSHOT_MAX_INTERVAL secondes, tout nouvel item est publié.
+        """
+        if not self.partial_enabled or self.partial_pending:
+            return
+        new_items = len(self.items) - self.partial_count
+        if new_items <= 0:
+            return
+        now = time.monotonic()
+        if self.partial_time is not None:
+            elapsed = now - self.partial_time
+            if elapsed < self.partial_interval:
+                return
+            overdue = self.partial_max_interval and elapsed >= self.partial_max_interval
+            if not overdue and new_items < max(self.partial_items, self.partial_count * self.partial_growth):
+                return
+        
+        # Copie de la liste : le réacteur continue d'y ajouter des items
+        self.partial_count = len(self.items)
+        self.partial_time = now
+        self.partial_pending = True
+        snapshot = {
+            'complete': False,
+            'items_count': self.partial_count,
+            'updated_at': datetime.now().isoformat(),
+            'items': self.items[:],
+        }
+        d = self.background.submit_logged(spider, self.write_partial, spider, snapshot)
+        d.addBoth(self.partial_written)
+    
+    def partial_written(self, _):
+        # Un seul snapshot en cours d'écriture : la fréquence s'adapte au disque
+        self.partial_pending = False
+    
+    def write_partial(self, spider, snapshot):
+        """(Thread d'écriture) Remplace atomiquement <fandom>_partial.json"""
+        for data_dir in ('../data', '../../frontend/public/data'):
+            path = f"{data_dir}/{spider.fandom_name}_partial.json"
+            tmp_path = f"{path}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'), default=dict)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                spider.logger.warning(f"Could not publish partial snapshot to {path}: {e}")
+    
+    def flush_journal(self, spider):
+        """Envoie les lignes de journal en attente au thread d'écriture"""
+        if self.journal_buffer:
+            lines, self.journal_buffer = self.journal_buffer, []
+            self.background.submit_logged(spider, self.write_journal, lines)
+    
+    def write_journal(self, lines):
+        self.journal.write(''.join(lines))
+        self.journal.flush()
     
     def process_item(self, item, spider):
         # Valider que l'item a au minimum les champs obligatoires
@@ -51,8 +259,17 @@ class JsonWriterPipeline:
             spider.logger.warning(f"Skipping item without name or image: {adapter.get('page_url')}")
             return item
         
-        self.items.append(dict(adapter))
-        return item
+        record = self.make_record(adapter)
+        self.items.append(record)
+        frontier = getattr(spider, 'frontier', None)
+        if frontier:
+            frontier.add_item(dict(record))
+        if self.journal_path:
+            self.journal_buffer.append(json.dumps(record, ensure_ascii=False, default=dict) + '\n')
+            if len(self.journal_buffer) >= self.journal_batch_size:
+                self.flush_journal(spider)
+        self.maybe_publish_partial(spider)
+        return self.background.backpressure(item)
 
 
 class ValidationPipeline:
@@ -94,3 +311,248 @@ class DuplicatesPipeline:
         
         self.seen_names.add(name)
         return item
+
+
+class SqliteStoragePipeline:
+    """Upsert des items dans la base SQLite (voir storage.CharacterStore)"""
+
+    def __init__(self, db_path, batch_size, queue_size=100):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.store = None
+        self.batch = []
+        self.background = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            db_path=crawler.settings.get('SQLITE_DB_PATH', '../data/fandoms.db'),
+            batch_size=crawler.settings.getint('SQLITE_BATCH_SIZE', 100),
+            queue_size=crawler.settings.getint('WRITER_QUEUE_SIZE', 100),
+        )
+
+    def open_spider(self, spider):
+        # La connexion SQLite est créée et utilisée dans le thread d'écriture
+        self.background = BackgroundWriter('SqliteStoragePipeline', self.queue_size)
+        spider.logger.info(f"Saving items to SQLite database {self.db_path}")
+        return self.background.submit(self.open_store)
+
+    def open_store(self):
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self.store = CharacterStore(self.db_path)
+
+    def close_spider(self, spider):
+        self.flush(spider)
+        self.background.submit_logged(spider, self.close_store)
+        return self.background.stop()
+
+    def close_store(self):
+        self.store.close()
+
+    def flush(self, spider):
+        if self.batch:
+            batch, self.batch = self.batch, []
+            self.background.submit_logged(spider, self.write_batch, batch)
+
+    def write_batch(self, batch):
+        self.store.upsert_many(batch)
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        if not adapter.get('name') or not adapter.get('image_url'):
+            return item
+
+        self.batch.append(dict(adapter))
+        if len(self.batch) >= self.batch_size:
+            self.flush(spider)
+        return self.background.backpressure(item)
+
+
+class ParquetExportPipeline:
+    """Export colonnaire (Parquet) des items pour l'analyse multi-fandoms.
+
+    Les fichiers sont écrits dans un dataset partitionné par fandom
+    (`<dir>/fandom_name=<fandom>/<timestamp>.parquet`), un row group par lot
+    de `PARQUET_BATCH_SIZE` items. `infobox_data` est stocké en map<string, string>.
+    """
+
+    STRING_FIELDS = (
+        'name', 'image_url', 'description', 'character_type', 'attribute_1',
+        'attribute_2', 'fandom_url', 'page_url', 'scraped_at',
+    )
+    LIST_FIELDS = ('categories', 'additional_images')
+
+    def __init__(self, export_dir, batch_size, compression, queue_size=100):
+        self.export_dir = export_dir
+        self.batch_size = batch_size
+        self.compression = compression
+        self.queue_size = queue_size
+        self.writer = None
+        self.background = None
+        self.batch = []
+        self.schema = pa.schema(
+            [(field, pa.string()) for field in self.STRING_FIELDS]
+            + [(field, pa.list_(pa.string())) for field in self.LIST_FIELDS]
+            + [('infobox_data', pa.map_(pa.string(), pa.string()))]
+        )
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if pa is None:
+            raise NotConfigured("pyarrow is not installed, Parquet export disabled")
+        return cls(
+            export_dir=crawler.settings.get('PARQUET_EXPORT_DIR', '../data/parquet'),
+            batch_size=crawler.settings.getint('PARQUET_BATCH_SIZE', 1000),
+            compression=crawler.settings.get('PARQUET_COMPRESSION', 'zstd'),
+            queue_size=crawler.settings.getint('WRITER_QUEUE_SIZE', 100),
+        )
+
+    def open_spider(self, spider):
+        partition_dir = os.path.join(self.export_dir, f"fandom_name={spider.fandom_name}")
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = os.path.join(partition_dir, f"{timestamp}.parquet")
+        spider.logger.info(f"Exporting items to Parquet file {filename}")
+
+        self.background = BackgroundWriter('ParquetExportPipeline', self.queue_size)
+        return self.background.submit(self.open_writer, partition_dir, filename)
+
+    def open_writer(self, partition_dir, filename):
+        os.makedirs(partition_dir, exist_ok=True)
+        self.writer = pq.ParquetWriter(filename, self.schema, compression=self.compression)
+
+    def close_spider(self, spider):
+        self.flush(spider)
+        self.background.submit_logged(spider, self.close_writer)
+        return self.background.stop()
+
+    def close_writer(self):
+        self.writer.close()
+
+    def flush(self, spider):
+        if self.batch:
+            batch, self.batch = self.batch, []
+            self.background.submit_logged(spider, self.write_batch, batch)
+
+    def write_batch(self, batch):
+        columns = {field: [] for field in self.schema.names}
+        for item in batch:
+            for field in self.STRING_FIELDS:
+                columns[field].append(item.get(field))
+            for field in self.LIST_FIELDS:
+                columns[field].append(item.get(field) or [])
+            infobox = item.get('infobox_data') or {}
+            columns['infobox_data'].append(list(infobox.items()))
+
+        self.writer.write_table(pa.table(columns, schema=self.schema))
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        if not adapter.get('name') or not adapter.get('image_url'):
+            return item
+
+        self.batch.append(dict(adapter))
+        if len(self.batch) >= self.batch_size:
+            self.flush(spider)
+        return self.background.backpressure(item)
+
+
+class ShardedJsonWriterPipeline:
+    """Sortie découpée en shards JSON Lines de taille fixe + manifest.
+
+    Chaque shard est écrit dès qu'il est plein dans
+    `../data/<fandom>_<timestamp>_shards/part-NNNNN.jsonl`. Le manifest donne
+    pour chaque shard le nombre d'items, l'index du premier item, la taille,
+    l'offset dans le flux concaténé et le sha256, pour pouvoir lire la page N
+    sans parser les autres. Le dossier est copié en `<fandom>_latest_shards`
+    à la fin du crawl.
+    """
+
+    def __init__(self, shard_size, queue_size=100):
+        self.shard_size = shard_size
+        self.queue_size = queue_size
+        self.background = None
+        self.output_dir = None
+        self.buffer = []
+        self.shards = []
+        self.total_items = 0
+        self.total_bytes = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('OUTPUT_SHARDED', False):
+            raise NotConfigured("Sharded output disabled (OUTPUT_SHARDED)")
+        return cls(
+            shard_size=crawler.settings.getint('OUTPUT_SHARD_SIZE', 1000),
+            queue_size=crawler.settings.getint('WRITER_QUEUE_SIZE', 100),
+        )
+
+    def open_spider(self, spider):
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.output_dir = f"../data/{spider.fandom_name}_{timestamp}_shards"
+        spider.logger.info(f"Saving sharded items to {self.output_dir}")
+
+        self.background = BackgroundWriter('ShardedJsonWriterPipeline', self.queue_size)
+        return self.background.submit(os.makedirs, self.output_dir, exist_ok=True)
+
+    def close_spider(self, spider):
+        self.flush_shard(spider)
+        self.background.submit_logged(spider, self.finish, spider)
+        return self.background.stop()
+
+    def finish(self, spider):
+        """(Thread d'écriture) Manifest et copie vers `<fandom>_latest_shards`"""
+        self.write_manifest(spider)
+
+        latest_dir = f"../data/{spider.fandom_name}_latest_shards"
+        shutil.rmtree(latest_dir, ignore_errors=True)
+        shutil.copytree(self.output_dir, latest_dir)
+        spider.logger.info(f"Wrote {len(self.shards)} shards ({self.total_items} items) to {latest_dir}")
+
+    def flush_shard(self, spider):
+        if self.buffer:
+            shard, self.buffer = self.buffer, []
+            self.background.submit_logged(spider, self.write_shard, shard)
+
+    def write_shard(self, shard):
+        data = ''.join(
+            json.dumps(item, ensure_ascii=False) + '\n' for item in shard
+        ).encode('utf-8')
+        filename = f"part-{len(self.shards):05d}.jsonl"
+        with open(os.path.join(self.output_dir, filename), 'wb') as f:
+            f.write(data)
+
+        self.shards.append({
+            'file': filename,
+            'count': len(shard),
+            'first_index': self.total_items,
+            'offset': self.total_bytes,
+            'bytes': len(data),
+            'sha256': hashlib.sha256(data).hexdigest(),
+        })
+        self.total_items += len(shard)
+        self.total_bytes += len(data)
+
+    def write_manifest(self, spider):
+        manifest = {
+            'fandom_name': spider.fandom_name,
+            'fandom_url': spider.fandom_url,
+            'format': 'jsonl',
+            'shard_size': self.shard_size,
+            'total_items': self.total_items,
+            'total_bytes': self.total_bytes,
+            'created_at': datetime.now().isoformat(),
+            'shards': self.shards,
+        }
+        with open(os.path.join(self.output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        if not adapter.get('name') or not adapter.get('image_url'):
+            return item
+
+        self.buffer.append(dict(adapter))
+        if len(self.buffer) >= self.shard_size:
+            self.flush_shard(spider)
+        return self.background.backpressure(item)
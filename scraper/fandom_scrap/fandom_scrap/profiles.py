@@ -0,0 +1,73 @@
+"""
+Profils d'extraction appris par wiki.
+
+Pour chaque champ (nom, image, description), le spider compte quel sélecteur
+de la cascade a trouvé la valeur. Le profil est enregistré dans
+`<SELECTOR_PROFILES_DIR>/<fandom>.json` à la fin du crawl et relu au suivant.
+
+Les cascades s'arrêtent au premier sélecteur qui trouve : leur ordre décide
+de la valeur extraite. Le profil ne le change donc pas, il sert seulement à
+repousser en fin de cascade les sélecteurs qui n'ont jamais rien trouvé sur
+ce wiki. Les sélecteurs connus gardent leur ordre d'origine entre eux, les
+autres ne sont essayés que si aucun sélecteur connu ne trouve ; le premier
+qui trouve devient connu.
+"""
+
+import json
+import os
+from datetime import datetime
+
+
+class SelectorProfile:
+    def __init__(self, path=None, fandom_name=None):
+        self.path = path
+        self.fandom_name = fandom_name
+        self.hits = {}
+        self._orders = {}
+        # Liste des (champ, sélecteur) enregistrés, tenue par les workers du pool
+        # d'extraction pour les renvoyer au processus principal
+        self.journal = None
+        if path:
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        for field, counts in data.get('fields', {}).items():
+            self.hits[field] = {selector: count for selector, count in counts.items() if count}
+
+    def save(self):
+        if not self.path or not self.hits:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fandom_name': self.fandom_name,
+                'updated_at': datetime.now().isoformat(),
+                'fields': self.hits,
+            }, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def order(self, field, selectors):
+        """Sélecteurs déjà gagnants sur ce wiki puis les autres, chacun dans l'ordre d'origine"""
+        ordered = self._orders.get(field)
+        if ordered is None:
+            counts = self.hits.get(field, {})
+            ordered = [s for s in selectors if s in counts] + [s for s in selectors if s not in counts]
+            self._orders[field] = ordered
+        return ordered
+
+    def record(self, field, selector):
+        counts = self.hits.setdefault(field, {})
+        counts[selector] = counts.get(selector, 0) + 1
+        if self.journal is not None:
+            self.journal.append((field, selector))
+
+        # Réordonner seulement quand un sélecteur devient connu
+        if counts[selector] == 1:
+            self._orders.pop(field, None)
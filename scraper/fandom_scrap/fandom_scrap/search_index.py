@@ -0,0 +1,103 @@
+"""
+Artefacts de recherche générés en fin de crawl pour l'autocomplétion.
+
+Au lieu de télécharger `<fandom>_latest.json` en entier, le frontend peut
+charger :
+
+- `summary.json` : liste légère (id, nom, miniature, type, shard) ;
+- `index.json`   : index des préfixes (1 à PREFIX_MAX_LENGTH caractères) et
+  des trigrammes des noms normalisés, vers les ids de `summary.json` ;
+- `shards/<n>.json` : les fiches complètes, chargées à la demande.
+
+Les ids sont les positions dans `summary.json`.
+"""
+
+import json
+import os
+import unicodedata
+
+
+PREFIX_MAX_LENGTH = 3
+
+COMPACT = {'separators': (',', ':'), 'ensure_ascii': False}
+
+
+def normalize_name(name):
+    """Minuscules sans accents, pour l'indexation et la recherche"""
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower().strip()
+
+
+def name_prefixes(normalized):
+    """Préfixes de chaque mot du nom (« luke skywalker » -> l, lu, luk, s, sk, sky)"""
+    prefixes = set()
+    for word in normalized.split():
+        for length in range(1, min(len(word), PREFIX_MAX_LENGTH) + 1):
+            prefixes.add(word[:length])
+    return prefixes
+
+
+def name_trigrams(normalized):
+    return {normalized[i:i + 3] for i in range(len(normalized) - 2)}
+
+
+def build_search_index(items, shard_size):
+    """Construit (summary, index, shards) à partir des items du crawl"""
+    if shard_size <= 0:
+        raise ValueError(f"shard_size must be positive, got {shard_size}")
+    summary = []
+    prefixes = {}
+    trigrams = {}
+    shards = []
+
+    for item_id, item in enumerate(items):
+        shard = item_id // shard_size
+        if shard == len(shards):
+            shards.append([])
+        shards[shard].append(item)
+
+        summary.append({
+            'id': item_id,
+            'name': item.get('name'),
+            'image_url': item.get('image_url'),
+            'character_type': item.get('character_type'),
+            'shard': shard,
+        })
+
+        normalized = normalize_name(item.get('name'))
+        for prefix in name_prefixes(normalized):
+            prefixes.setdefault(prefix, []).append(item_id)
+        for trigram in name_trigrams(normalized):
+            trigrams.setdefault(trigram, []).append(item_id)
+
+    index = {
+        'prefix_max_length': PREFIX_MAX_LENGTH,
+        'shard_size': shard_size,
+        'prefixes': prefixes,
+        'trigrams': trigrams,
+    }
+    return summary, index, shards
+
+
+def write_search_index(items, output_dir, shard_size):
+    """Écrit summary.json, index.json et shards/ dans `output_dir`"""
+    summary, index, shards = build_search_index(items, shard_size)
+
+    shards_dir = os.path.join(output_dir, 'shards')
+    os.makedirs(shards_dir, exist_ok=True)
+
+    # Supprimer les shards d'un crawl précédent plus volumineux
+    for filename in os.listdir(shards_dir):
+        stem = filename[:-len('.json')]
+        if filename.endswith('.json') and stem.isdigit() and int(stem) >= len(shards):
+            os.remove(os.path.join(shards_dir, filename))
+
+    for number, shard in enumerate(shards):
+        with open(os.path.join(shards_dir, f"{number}.json"), 'w', encoding='utf-8') as f:
+            json.dump(shard, f, default=dict, **COMPACT)
+
+    with open(os.path.join(output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, **COMPACT)
+
+    with open(os.path.join(output_dir, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f, **COMPACT)
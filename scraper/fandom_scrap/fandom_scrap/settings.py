@@ -42,6 +42,39 @@ DEFAULT_REQUEST_HEADERS = {
     'Connection': 'keep-alive',
 }
 
+# Special:AllPages découpé en plages alphabétiques parcourues en parallèle
+# (1 plage pour ALLPAGES_PAGES_PER_PARTITION articles, au plus ALLPAGES_MAX_PARTITIONS)
+ALLPAGES_PAGES_PER_PARTITION = 2000
+ALLPAGES_MAX_PARTITIONS = 16
+
+# Noms locaux des namespaces à exclure des liens (ex. ["Catégorie", "Modèle"]).
+# Vide : lus une fois via l'API siteinfo au démarrage du crawl
+WIKI_NAMESPACES = []
+
+# Frontière partagée entre plusieurs processus/machines pour un même fandom.
+# Activer avec SCHEDULER = "fandom_scrap.frontier.SharedFrontierScheduler" et
+# FRONTIER_URL = "sqlite:///../data/frontier.db" ou "redis://localhost:6379/0"
+FRONTIER_URL = None
+FRONTIER_NAME = None  # par défaut : nom du fandom
+FRONTIER_LEASE_SECONDS = 300
+FRONTIER_MAX_ATTEMPTS = 3
+
+# Profils de sélecteurs appris par wiki (sélecteurs jamais gagnants essayés en dernier)
+SELECTOR_PROFILES_ENABLED = True
+SELECTOR_PROFILES_DIR = '../data/profiles'
+
+# Items compacts (slots + chaînes internées) au lieu de dicts scrapy.Item
+COMPACT_ITEMS = True
+
+# Erreurs agrégées par (type, statut HTTP, motif d'URL) dans le rapport
+ERRORS_MAX_GROUPS = 100
+ERRORS_MAX_SAMPLES = 5
+
+# Extraction HTML dans un pool de processus (0 = sur le thread du réacteur)
+EXTRACTION_PROCESSES = 0
+# Nombre max de pages en cours d'extraction (0 = 2 x EXTRACTION_PROCESSES)
+EXTRACTION_MAX_INFLIGHT = 0
+
 # Disable cookies (enabled by default)
 #COOKIES_ENABLED = False
 
@@ -62,15 +95,38 @@ DEFAULT_REQUEST_HEADERS = {
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
-#    "fandom_scrap.middlewares.FandomScrapDownloaderMiddleware": 543,
-#}
+DOWNLOADER_MIDDLEWARES = {
+    "fandom_scrap.archive.ArchiveReplayMiddleware": 50,
+    "fandom_scrap.middlewares.TransportStatsMiddleware": 595,
+}
+
+# Transport HTTP/2 (une connexion multiplexée par hôte) + encodages br/zstd.
+# Nécessite Twisted[http2], brotli et zstandard ; voir run_scraper.py --http2
+HTTP2_ENABLED = False
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
+EXTENSIONS = {
+    "fandom_scrap.archive.ArchiveRecorder": 500,
+    "fandom_scrap.backpressure.MemoryBackpressure": 510,
+    "fandom_scrap.deadline.CrawlDeadline": 520,
+}
+
+# Contre-pression mémoire : pause de la découverte au-delà d'un budget
+# (0 = désactivé ; RSS en Mo et/ou nombre de requêtes en file)
+MEMORY_BUDGET_MB = 0
+MEMORY_BUDGET_MAX_QUEUE = 0
+MEMORY_BUDGET_CHECK_INTERVAL = 2.0
+MEMORY_BUDGET_RESUME_RATIO = 0.8
+MEMORY_BUDGET_RELEASE_BATCH = 100
+
+# Crawl borné dans le temps (-a deadline=SECONDES) : la découverte s'arrête
+# DEADLINE_DRAIN_SECONDS avant l'échéance pour terminer les fiches en file
+DEADLINE_DRAIN_SECONDS = 30
+
+# Archive WARC des réponses brutes (rejouable avec reextract.py)
+ARCHIVE_ENABLED = False
+ARCHIVE_DIR = "../data/archives"
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
@@ -78,8 +134,55 @@ ITEM_PIPELINES = {
     "fandom_scrap.pipelines.ValidationPipeline": 200,
     "fandom_scrap.pipelines.DuplicatesPipeline": 250,
     "fandom_scrap.pipelines.JsonWriterPipeline": 300,
+    "fandom_scrap.pipelines.SqliteStoragePipeline": 310,
+    "fandom_scrap.pipelines.ParquetExportPipeline": 320,
+    "fandom_scrap.pipelines.ShardedJsonWriterPipeline": 330,
 }
 
+# Écritures des pipelines dans des threads dédiés : au plus WRITER_QUEUE_SIZE
+# écritures en attente par pipeline (au-delà, les items attendent sans bloquer
+# le réacteur), journal de reprise (JOBDIR) écrit par lots de JOURNAL_BATCH_SIZE
+WRITER_QUEUE_SIZE = 100
+JOURNAL_BATCH_SIZE = 50
+
+# Base SQLite (upsert des items, index + FTS pour les recherches)
+SQLITE_DB_PATH = "../data/fandoms.db"
+SQLITE_BATCH_SIZE = 100
+
+# Export Parquet (désactivé automatiquement si pyarrow n'est pas installé)
+PARQUET_EXPORT_DIR = "../data/parquet"
+PARQUET_BATCH_SIZE = 1000
+PARQUET_COMPRESSION = "zstd"
+
+# Snapshots partiels <fandom>_partial.json ("complete": false) publiés pendant le
+# crawl, au premier item puis au plus toutes les T secondes, une fois gagnés
+# N items et au moins GROWTH x la taille du snapshot précédent. Sur un crawl
+# lent, ce seuil espace beaucoup les snapshots : au-delà de MAX_INTERVAL
+# secondes (0 = sans plafond), tout nouvel item déclenche une publication
+PARTIAL_SNAPSHOTS_ENABLED = True
+PARTIAL_SNAPSHOT_ITEMS = 50
+PARTIAL_SNAPSHOT_INTERVAL = 10
+PARTIAL_SNAPSHOT_GROWTH = 0.25
+PARTIAL_SNAPSHOT_MAX_INTERVAL = 60
+
+# Deltas versionnés (ajouts/modifications/suppressions) entre deux "latest",
+# dans <fandom>_deltas/ ; seuls les DELTA_KEEP_VERSIONS derniers sont gardés
+DELTA_ENABLED = True
+DELTA_KEEP_VERSIONS = 20
+
+# Index de recherche (préfixes/trigrammes + résumé + shards) écrit en fin de crawl
+SEARCH_INDEX_ENABLED = True
+SEARCH_INDEX_SHARD_SIZE = 200
+
+# <fandom>_facets.json : effectifs par type et attribut, couverture des clés
+# d'infobox et plages taille/poids/âge, calculés en fin de crawl
+FACETS_ENABLED = True
+FACETS_MAX_VALUES = 50
+
+# Sortie en shards JSON Lines + manifest (pour les très gros fandoms)
+OUTPUT_SHARDED = False
+OUTPUT_SHARD_SIZE = 1000
+
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
 #AUTOTHROTTLE_ENABLED = True
@@ -0,0 +1,72 @@
+"""
+Lecture incrémentale des sitemaps XML publiés par les wikis Fandom.
+
+Fandom expose un index (`/sitemap-newsitemapxml-index.xml`) qui pointe vers
+des sous-sitemaps par namespace (`...-NS_0-p1.xml` pour les articles). Les
+entrées sont lues avec `iterparse` et libérées au fur et à mesure, sans
+construire l'arbre complet.
+"""
+
+import gzip
+import io
+import re
+from datetime import datetime, timezone
+
+from lxml import etree
+
+
+SITEMAP_INDEX_PATH = '/sitemap-newsitemapxml-index.xml'
+
+# Namespace MediaWiki dans le nom des sous-sitemaps Fandom
+_NAMESPACE_RE = re.compile(r'NS_(\d+)')
+
+
+def sitemap_namespace(url):
+    """Namespace d'un sous-sitemap Fandom (None si absent du nom)"""
+    match = _NAMESPACE_RE.search(url)
+    return int(match.group(1)) if match else None
+
+
+def parse_lastmod(value):
+    """Convertit un <lastmod> W3C (date ou date+heure) en datetime UTC"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def iter_sitemap(body):
+    """Génère (type, loc, lastmod) pour chaque entrée d'un sitemap.
+
+    `type` vaut 'sitemap' pour une entrée d'index et 'url' pour une page.
+    """
+    if body[:2] == b'\x1f\x8b':
+        body = gzip.decompress(body)
+
+    context = etree.iterparse(
+        io.BytesIO(body), events=('end',), recover=True, resolve_entities=False
+    )
+    for _, element in context:
+        tag = etree.QName(element).localname if isinstance(element.tag, str) else None
+        if tag in ('url', 'sitemap'):
+            loc = lastmod = None
+            for child in element:
+                if not isinstance(child.tag, str):
+                    continue
+                name = etree.QName(child).localname
+                if name == 'loc':
+                    loc = (child.text or '').strip()
+                elif name == 'lastmod':
+                    lastmod = parse_lastmod(child.text)
+            if loc:
+                yield tag, loc, lastmod
+
+            # Libérer la mémoire des entrées déjà traitées
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
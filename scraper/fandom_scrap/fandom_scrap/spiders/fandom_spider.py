@@ -4,15 +4,60 @@ import json
 import logging
 import random
 import os
-from datetime import datetime
-from urllib.parse import urljoin, urlparse
-from fandom_scrap.items import FandomCharacterItem
+from collections import deque
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse
+from fandom_scrap.archive import read_index
+from fandom_scrap.backpressure import peak_rss_mb
+from fandom_scrap.errors import ErrorAggregator
+from fandom_scrap.extraction_pool import ExtractionPool
+from fandom_scrap.items import CompactCharacterItem, FandomCharacterItem
+from fandom_scrap.namespaces import SITEINFO_NAMESPACES_QUERY, LinkClassifier, siteinfo_namespaces
+from fandom_scrap.profiles import SelectorProfile
+from fandom_scrap.sitemap import SITEMAP_INDEX_PATH, iter_sitemap, parse_lastmod, sitemap_namespace
+
+
+# Répartition approximative de la première lettre des titres de pages,
+# utilisée pour découper Special:AllPages en plages de taille comparable
+TITLE_INITIAL_WEIGHTS = [
+    ('A', 6), ('B', 7), ('C', 7), ('D', 6), ('E', 4), ('F', 3), ('G', 5),
+    ('H', 5), ('I', 2), ('J', 4), ('K', 5), ('L', 5), ('M', 7), ('N', 3),
+    ('O', 2), ('P', 5), ('Q', 0.3), ('R', 5), ('S', 9), ('T', 5), ('U', 1),
+    ('V', 2), ('W', 3), ('X', 0.3), ('Y', 1), ('Z', 1),
+]
+
+
+def alphabetic_ranges(partitions):
+    """Découpe l'espace des titres en `partitions` plages (from, to).
+
+    La première plage n'a pas de borne basse (chiffres, ponctuation) et la
+    dernière pas de borne haute (caractères non ASCII).
+    """
+    total = sum(weight for _, weight in TITLE_INITIAL_WEIGHTS)
+    boundaries = []
+    cumulative = 0
+    for letter, weight in TITLE_INITIAL_WEIGHTS:
+        target = total * (len(boundaries) + 1) / partitions
+        if cumulative and cumulative >= target and len(boundaries) < partitions - 1:
+            boundaries.append(letter)
+        cumulative += weight
+    
+    starts = [None] + boundaries
+    ends = boundaries + [None]
+    return list(zip(starts, ends))
 
 
 class FandomSpider(scrapy.Spider):
     name = 'fandom'
     
-    def __init__(self, fandom_url=None, max_pages=None, *args, **kwargs):
+    # Items produits en CompactCharacterItem (réglage COMPACT_ITEMS)
+    compact_items = False
+    
+    # Ordre appris des sélecteurs pour ce wiki (voir profiles.py)
+    selector_profile = None
+    
+    def __init__(self, fandom_url=None, max_pages=None, discovery=None, sitemap_since=None,
+                 replay_archive=None, deadline=None, *args, **kwargs):
         super(FandomSpider, self).__init__(*args, **kwargs)
         
         if not fandom_url:
@@ -21,8 +66,35 @@ class FandomSpider(scrapy.Spider):
         self.fandom_url = fandom_url.rstrip('/')
         self.max_pages = int(max_pages) if max_pages else None
         self.pages_scraped = 0
-        self.errors = []
+        self.errors = ErrorAggregator()
         self.start_time = datetime.now()
+        self.extraction_pool = None
+        # Frontière partagée (posée par SharedFrontierScheduler)
+        self.frontier = None
+        # Dernière valeur connue du compteur global de pages de la frontière
+        self.frontier_pages = None
+        
+        # Découverte des pages : 'categories' (par défaut) ou 'sitemap'
+        self.discovery = discovery or 'categories'
+        if self.discovery not in ('categories', 'sitemap'):
+            raise ValueError(f"Unknown discovery mode: {self.discovery}")
+        self.sitemap_since = parse_lastmod(sitemap_since) if sitemap_since else None
+        self.sitemap_scheduled = 0
+        
+        # Filtre des liens (namespaces anglais en attendant ceux du wiki)
+        self.link_classifier = LinkClassifier(self.fandom_url)
+        self.site_articles = None
+        
+        # Contre-pression mémoire (voir backpressure.MemoryBackpressure)
+        self.discovery_paused = False
+        self.deferred_links = deque()
+        
+        # Budget de temps en secondes (voir deadline.CrawlDeadline)
+        self.deadline = float(deadline) if deadline else None
+        self.draining = False
+        
+        # Rejeu hors ligne d'une archive WARC (voir reextract.py)
+        self.replay_archive = replay_archive
         
         # Extraction du nom du fandom depuis l'URL
         parsed_url = urlparse(fandom_url)
@@ -30,6 +102,47 @@ class FandomSpider(scrapy.Spider):
         
         self.start_urls = self.generate_random_category_urls()
     
+    @classmethod
+    def update_settings(cls, settings):
+        super().update_settings(settings)
+        
+        # HTTP2_ENABLED : les requêtes https passent par le handler HTTP/2
+        if settings.getbool('HTTP2_ENABLED'):
+            handlers = settings.getdict('DOWNLOAD_HANDLERS')
+            handlers['https'] = 'fandom_scrap.transport.FandomH2DownloadHandler'
+            settings.set('DOWNLOAD_HANDLERS', handlers, priority='spider')
+    
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        
+        # Erreurs agrégées, exposées dans les stats Scrapy (errors/*)
+        spider.errors = ErrorAggregator(
+            crawler=crawler,
+            max_groups=crawler.settings.getint('ERRORS_MAX_GROUPS', 100),
+            max_samples=crawler.settings.getint('ERRORS_MAX_SAMPLES', 5),
+        )
+        
+        spider.compact_items = crawler.settings.getbool('COMPACT_ITEMS', True)
+        
+        if crawler.settings.getbool('SELECTOR_PROFILES_ENABLED', True):
+            profiles_dir = crawler.settings.get('SELECTOR_PROFILES_DIR', '../data/profiles')
+            spider.selector_profile = SelectorProfile(
+                os.path.join(profiles_dir, f"{spider.fandom_name}.json"), spider.fandom_name
+            )
+        
+        # Extraction dans un pool de processus (désactivée par défaut)
+        processes = crawler.settings.getint('EXTRACTION_PROCESSES', 0)
+        if processes > 0:
+            max_inflight = crawler.settings.getint('EXTRACTION_MAX_INFLIGHT', 0) or processes * 2
+            spider.extraction_pool = ExtractionPool(
+                processes, max_inflight, spider.fandom_url, spider.fandom_name,
+                profile_path=spider.selector_profile.path if spider.selector_profile else None,
+            )
+            spider.logger.info(f"HTML extraction offloaded to {processes} processes")
+        
+        return spider
+    
     def load_categories_from_file(self):
         """Charge les catégories depuis le fichier fandom_categories.txt"""
         categories = []
@@ -95,9 +208,242 @@ class FandomSpider(scrapy.Spider):
         
         return all_urls
     
+    async def start(self):
+        """Point d'entrée Scrapy >= 2.13 : délègue à start_requests()"""
+        for request in self.start_requests():
+            yield request
+    
     def start_requests(self):
         """Démarre les requêtes initiales"""
+        if self.replay_archive:
+            yield from self.replay_requests()
+            return
+        
+        # Avec JOBDIR, `self.state` est persisté entre deux exécutions :
+        # on reprend les mêmes catégories et le même compteur de pages
+        state = getattr(self, 'state', None)
+        if state is not None:
+            if 'start_urls' in state:
+                self.start_urls = state['start_urls']
+                self.pages_scraped = state.get('pages_scraped', 0)
+                self.logger.info(f"Resuming job: {self.pages_scraped} pages already scraped")
+            else:
+                state['start_urls'] = self.start_urls
+        
+        # Namespaces fixés par configuration : pas besoin de l'API siteinfo
+        configured_namespaces = self.settings.getlist('WIKI_NAMESPACES')
+        if configured_namespaces:
+            self.link_classifier = LinkClassifier(self.fandom_url, configured_namespaces)
+            yield from self.discovery_requests()
+            return
+        
+        # Namespaces locaux et statistiques du wiki en une seule requête
+        yield scrapy.Request(
+            url=f"{self.fandom_url}/api.php?action=query&meta=siteinfo"
+                f"&{SITEINFO_NAMESPACES_QUERY}|statistics&format=json",
+            callback=self.parse_siteinfo,
+            errback=self.handle_siteinfo_error,
+            dont_filter=True,
+            meta={'dont_cache': True}
+        )
+    
+    def parse_siteinfo(self, response):
+        """Compile le filtre de liens avec les namespaces du wiki, puis lance la découverte"""
+        try:
+            data = json.loads(response.text)
+            self.link_classifier = LinkClassifier(self.fandom_url, siteinfo_namespaces(data))
+            self.logger.info(f"Link classifier built from {self.link_classifier.namespace_count} namespace names")
+            articles = data.get('query', {}).get('statistics', {}).get('articles')
+            if articles is not None:
+                self.site_articles = int(articles)
+        except (ValueError, AttributeError, TypeError) as e:
+            self.logger.warning(f"Could not read site namespaces: {e}")
+        
+        yield from self.discovery_requests()
+    
+    def handle_siteinfo_error(self, failure):
+        """siteinfo indisponible : namespaces anglais uniquement"""
+        self.handle_error(failure)
+        self.logger.warning("Site namespaces unavailable, using English namespace names")
+        yield from self.discovery_requests()
+    
+    def discovery_requests(self):
+        """Requêtes de découverte des fiches (sitemap ou catégories)"""
+        if self.discovery == 'sitemap':
+            yield scrapy.Request(
+                url=f"{self.fandom_url}{SITEMAP_INDEX_PATH}",
+                callback=self.parse_sitemap,
+                errback=self.handle_sitemap_error,
+                meta={'dont_cache': True}
+            )
+            return
+        
+        yield from self.category_requests()
+    
+    def replay_requests(self):
+        """Une requête par fiche personnage de l'archive, servie par ArchiveReplayMiddleware"""
+        character_callback = self.character_page_callback()
+        archive_path = os.path.abspath(self.replay_archive)
+        
+        for entry in read_index(archive_path):
+            if entry['callback'] not in ('parse_character_page', 'parse_character_page_pooled'):
+                continue
+            if entry['status'] != 200:
+                continue
+            
+            yield scrapy.Request(
+                url=entry['url'],
+                callback=character_callback,
+                errback=self.handle_error,
+                dont_filter=True,
+                meta={'archive_record': (archive_path, entry['offset'], entry['length'])}
+            )
+    
+    def category_requests(self):
+        """Requêtes vers les catégories de départ"""
+        if self.draining:
+            return
+        
+        allpages_url = f"{self.fandom_url}/wiki/Special:AllPages"
+        
         for url in self.start_urls:
+            # Special:AllPages est découpé en plages parcourues en parallèle
+            if url == allpages_url and self.site_articles is not None:
+                yield from self.allpages_requests(self.allpages_partitions(self.site_articles))
+                continue
+            if url == allpages_url:
+                yield scrapy.Request(
+                    url=f"{self.fandom_url}/api.php?action=query&meta=siteinfo&siprop=statistics&format=json",
+                    callback=self.parse_site_statistics,
+                    errback=self.handle_statistics_error,
+                    meta={'dont_cache': True}
+                )
+                continue
+            
+            yield scrapy.Request(
+                url=url,
+                callback=self.parse_category_page,
+                errback=self.handle_error,
+                meta={'dont_cache': True}
+            )
+    
+    def character_page_callback(self):
+        """Callback des fiches personnages (pool de processus ou non)"""
+        if self.extraction_pool:
+            return self.parse_character_page_pooled
+        return self.parse_character_page
+    
+    def parse_sitemap(self, response):
+        """Parse l'index ou un sous-sitemap Fandom"""
+        if self.draining:
+            return
+        
+        is_index = response.url.endswith(SITEMAP_INDEX_PATH)
+        entries = 0
+        skipped = 0
+        character_callback = self.character_page_callback()
+        
+        for kind, loc, lastmod in iter_sitemap(response.body):
+            entries += 1
+            
+            if kind == 'sitemap':
+                # Seulement le namespace principal (articles)
+                if sitemap_namespace(loc) not in (None, 0):
+                    continue
+                yield scrapy.Request(
+                    url=loc,
+                    callback=self.parse_sitemap,
+                    errback=self.handle_error,
+                    priority=self.discovery_priority(),
+                    meta={'dont_cache': True}
+                )
+                continue
+            
+            # Pages inchangées depuis la date demandée
+            if self.sitemap_since and lastmod and lastmod < self.sitemap_since:
+                skipped += 1
+                continue
+            
+            if not self.is_valid_character_page(loc):
+                continue
+            
+            if self.max_pages and self.sitemap_scheduled >= self.max_pages:
+                break
+            
+            self.sitemap_scheduled += 1
+            
+            if self.discovery_paused:
+                self.deferred_links.append(loc)
+                continue
+            
+            yield scrapy.Request(
+                url=loc,
+                callback=character_callback,
+                errback=self.handle_error,
+                priority=self.lastmod_priority(lastmod),
+                meta={'dont_cache': True}
+            )
+        
+        self.logger.info(f"Sitemap {response.url}: {entries} entries, {skipped} unchanged pages skipped")
+        
+        # Pas de sitemap exploitable : retour à la découverte par catégories
+        if is_index and entries == 0:
+            self.logger.warning("Empty sitemap index, falling back to category discovery")
+            yield from self.category_requests()
+    
+    def lastmod_priority(self, lastmod):
+        """Priorité Scrapy : les pages modifiées récemment passent en premier"""
+        if not lastmod:
+            return -3650
+        days_old = (datetime.now(timezone.utc) - lastmod).days
+        return -min(max(days_old, 0), 3650)
+    
+    def handle_sitemap_error(self, failure):
+        """Sitemap indisponible : retour à la découverte par catégories"""
+        self.handle_error(failure)
+        self.logger.warning("Sitemap unavailable, falling back to category discovery")
+        yield from self.category_requests()
+    
+    def parse_site_statistics(self, response):
+        """Choisit le nombre de plages de Special:AllPages selon la taille du wiki"""
+        try:
+            articles = int(json.loads(response.text)['query']['statistics']['articles'])
+        except (ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"Could not read site statistics: {e}")
+            articles = 0
+        
+        yield from self.allpages_requests(self.allpages_partitions(articles))
+    
+    def allpages_partitions(self, articles):
+        """Nombre de plages de Special:AllPages pour `articles` articles"""
+        pages_per_partition = self.settings.getint('ALLPAGES_PAGES_PER_PARTITION', 2000)
+        max_partitions = self.settings.getint('ALLPAGES_MAX_PARTITIONS', 16)
+        partitions = max(1, min(max_partitions, articles // pages_per_partition))
+        
+        self.logger.info(f"{articles} articles: Special:AllPages split into {partitions} ranges")
+        return partitions
+    
+    def handle_statistics_error(self, failure):
+        """Statistiques indisponibles : Special:AllPages en une seule plage"""
+        self.handle_error(failure)
+        yield from self.allpages_requests(1)
+    
+    def allpages_requests(self, partitions):
+        """Une requête Special:AllPages par plage alphabétique (from/to)"""
+        if self.draining:
+            return
+        
+        for start, end in alphabetic_ranges(partitions):
+            params = {}
+            if start:
+                params['from'] = start
+            if end:
+                params['to'] = end
+            
+            url = f"{self.fandom_url}/wiki/Special:AllPages"
+            if params:
+                url = f"{url}?{urlencode(params)}"
+            
             yield scrapy.Request(
                 url=url,
                 callback=self.parse_category_page,
@@ -107,6 +453,10 @@ class FandomSpider(scrapy.Spider):
     
     def parse_category_page(self, response):
         """Parse les pages de catégories pour trouver les liens vers les fiches"""
+        # Échéance proche : plus de nouvelles fiches ni de pagination
+        if self.draining:
+            return
+        
         # Différents sélecteurs pour les listes de pages selon la structure Fandom
         character_links = []
         
@@ -139,18 +489,27 @@ class FandomSpider(scrapy.Spider):
         self.logger.info(f"Found {len(valid_links)} potential character pages on {response.url}")
         
         # Scraper chaque page de personnage
-        for link in valid_links:
-            if self.max_pages and self.pages_scraped >= self.max_pages:
+        character_callback = self.character_page_callback()
+        
+        for index, link in enumerate(valid_links):
+            # Compteur global relu une fois par page de catégorie, pas par lien
+            if self.page_budget_reached(refresh=index == 0):
+                break
+            
+            # Budget mémoire dépassé : les liens restants sont mis de côté
+            if self.discovery_paused:
+                self.deferred_links.extend(valid_links[index:])
                 break
             
             yield scrapy.Request(
                 url=link,
-                callback=self.parse_character_page,
+                callback=character_callback,
                 errback=self.handle_error,
                 meta={'dont_cache': True}
             )
         
-        # Suivre la pagination si elle existe
+        # Suivre la pagination si elle existe (en dernier si la découverte est en pause)
+        discovery_priority = self.discovery_priority()
         next_page_selectors = [
             'a.category-page__pagination-next::attr(href)',
             'a[rel="next"]::attr(href)',
@@ -163,85 +522,188 @@ class FandomSpider(scrapy.Spider):
                 yield scrapy.Request(
                     url=urljoin(response.url, next_page),
                     callback=self.parse_category_page,
-                    errback=self.handle_error
+                    errback=self.handle_error,
+                    priority=discovery_priority
                 )
                 break
+        else:
+            # Special:AllPages n'a pas de lien rel="next" : la page suivante
+            # est le lien de navigation dont `from` est après la page courante
+            next_page = self.allpages_next_link(response)
+            if next_page:
+                yield scrapy.Request(
+                    url=urljoin(response.url, next_page),
+                    callback=self.parse_category_page,
+                    errback=self.handle_error,
+                    priority=discovery_priority
+                )
+    
+    def discovery_priority(self):
+        """Priorité des pages de découverte : très basse quand la découverte est en pause"""
+        return -10000 if self.discovery_paused else 0
+    
+    def release_deferred_links(self, count):
+        """Requêtes pour au plus `count` liens mis de côté par la contre-pression"""
+        character_callback = self.character_page_callback()
+        refresh = True
+        while self.deferred_links and count > 0 and not self.draining:
+            if self.page_budget_reached(refresh=refresh):
+                self.deferred_links.clear()
+                break
+            refresh = False
+            count -= 1
+            yield scrapy.Request(
+                url=self.deferred_links.popleft(),
+                callback=character_callback,
+                errback=self.handle_error,
+                meta={'dont_cache': True}
+            )
+    
+    def allpages_next_link(self, response):
+        """Lien « page suivante » de Special:AllPages, borné à la plage to= de la partition
+
+        La navigation de Special:AllPages ne reporte pas `to` : il est recopié
+        depuis l'URL courante et la partition s'arrête quand `from` le dépasse,
+        sinon chaque partition parcourrait tout le reste du wiki.
+        """
+        query = parse_qs(urlparse(response.url).query)
+        current = query.get('from', [''])[0]
+        end = query.get('to', [''])[0]
+        for link in response.css('.mw-allpages-nav a::attr(href)').getall():
+            target_query = parse_qs(urlparse(link).query)
+            target = target_query.get('from', [''])[0]
+            if target <= current:
+                continue
+            if not end:
+                return link
+            if target > end:
+                return None
+            if 'to' not in target_query:
+                link = f"{link}&{urlencode({'to': end})}"
+            return link
+        return None
+    
+    def ordered_selectors(self, field, selectors):
+        """Cascade de sélecteurs d'un champ, ceux qui n'ont jamais trouvé sur ce wiki en dernier"""
+        if self.selector_profile is None:
+            return selectors
+        return self.selector_profile.order(field, selectors)
+    
+    def selector_hit(self, field, selector):
+        if self.selector_profile is not None:
+            self.selector_profile.record(field, selector)
     
     def is_valid_character_page(self, link):
         """Vérifie si un lien pointe vers une page de personnage valide"""
-        if not link:
+        return self.link_classifier.is_article(link)
+    
+    def count_page(self):
+        """Compte une page de personnage (localement et dans la frontière partagée)"""
+        self.pages_scraped += 1
+        if self.frontier:
+            self.frontier_pages = self.frontier.incr_pages()
+    
+    def page_budget_reached(self, refresh=False):
+        """Vrai si max_pages est atteint (globalement en mode frontière partagée)
+
+        En mode frontière, le compteur global n'est relu dans le backend que
+        si `refresh` : sinon on se fie à la dernière valeur connue, tenue à
+        jour par count_page.
+        """
+        if not self.max_pages:
             return False
-        
-        # Exclusions communes
-        excluded_patterns = [
-            '/wiki/Special:',
-            '/wiki/Category:',
-            '/wiki/Template:',
-            '/wiki/File:',
-            '/wiki/User:',
-            '/wiki/Talk:',
-            '/wiki/Help:',
-            '/wiki/MediaWiki:',
-            'action=edit',
-            'redlink=1',
-            '#',
-        ]
-        
-        for pattern in excluded_patterns:
-            if pattern in link:
-                return False
-        
-        return True
+        if self.frontier:
+            if refresh or self.frontier_pages is None:
+                self.frontier_pages = self.frontier.pages()
+            return self.frontier_pages >= self.max_pages
+        return self.pages_scraped >= self.max_pages
     
     def parse_character_page(self, response):
         """Parse une page de personnage individuelle"""
         try:
-            self.pages_scraped += 1
-            
-            item = FandomCharacterItem()
-            
-            # Métadonnées de base
-            item['fandom_url'] = self.fandom_url
-            item['fandom_name'] = self.fandom_name
-            item['page_url'] = response.url
-            item['scraped_at'] = datetime.now().isoformat()
+            self.count_page()
             
-            # Extraction du nom
-            item['name'] = self.extract_name(response)
-            
-            # Extraction de l'image principale (OBLIGATOIRE)
-            item['image_url'] = self.extract_main_image(response)
+            item = self.extract_character(response)
             
             # Si pas d'image trouvée, on skip cette fiche
-            if not item['image_url']:
+            if item is None:
                 self.logger.warning(f"No image found for {response.url}, skipping")
                 return
             
-            # Extraction des autres données
-            item['description'] = self.extract_description(response)
-            item['character_type'] = self.extract_character_type(response)
-            
-            # Extraction des attributs supplémentaires depuis l'infobox
-            infobox_data = self.extract_infobox_data(response)
-            item['infobox_data'] = infobox_data
-            
-            # Tentative d'extraction de 2 attributs structurés
-            attributes = self.extract_attributes(infobox_data, response)
-            item['attribute_1'] = attributes.get('attribute_1', '')
-            item['attribute_2'] = attributes.get('attribute_2', '')
-            
-            # Catégories
-            item['categories'] = self.extract_categories(response)
-            
-            # Images supplémentaires
-            item['additional_images'] = self.extract_additional_images(response)
-            
             yield item
             
         except Exception as e:
             error_msg = f"Error parsing {response.url}: {str(e)}"
             self.logger.error(error_msg)
-            self.errors.append(error_msg)
+            self.errors.record(type(e).__name__, response.url, str(e))
+    
+    async def parse_character_page_pooled(self, response):
+        """Variante de parse_character_page : l'extraction tourne dans le pool de processus"""
+        self.count_page()
+        
+        try:
+            data, hits = await self.extraction_pool.extract(response)
+        except Exception as e:
+            error_msg = f"Error parsing {response.url}: {str(e)}"
+            self.logger.error(error_msg)
+            self.errors.record(type(e).__name__, response.url, str(e))
+            return
+        
+        # Sélecteurs gagnants dans le worker, appris par le profil du processus principal
+        for field, selector in hits:
+            self.selector_hit(field, selector)
+        
+        if data is None:
+            self.logger.warning(f"No image found for {response.url}, skipping")
+            return
+        
+        yield self.build_item(data)
+    
+    def extract_character(self, response):
+        """Construit l'item d'une page de personnage (None si pas d'image)"""
+        item = {}
+        
+        # Métadonnées de base
+        item['fandom_url'] = self.fandom_url
+        item['fandom_name'] = self.fandom_name
+        item['page_url'] = response.url
+        item['scraped_at'] = datetime.now().isoformat()
+        
+        # Extraction du nom
+        item['name'] = self.extract_name(response)
+        
+        # Extraction de l'image principale (OBLIGATOIRE)
+        item['image_url'] = self.extract_main_image(response)
+        
+        if not item['image_url']:
+            return None
+        
+        # Extraction des autres données
+        item['description'] = self.extract_description(response)
+        item['character_type'] = self.extract_character_type(response)
+        
+        # Extraction des attributs supplémentaires depuis l'infobox
+        infobox_data = self.extract_infobox_data(response)
+        item['infobox_data'] = infobox_data
+        
+        # Tentative d'extraction de 2 attributs structurés
+        attributes = self.extract_attributes(infobox_data, response)
+        item['attribute_1'] = attributes.get('attribute_1', '')
+        item['attribute_2'] = attributes.get('attribute_2', '')
+        
+        # Catégories
+        item['categories'] = self.extract_categories(response)
+        
+        # Images supplémentaires
+        item['additional_images'] = self.extract_additional_images(response)
+        
+        return self.build_item(item)
+    
+    def build_item(self, data):
+        """Item Scrapy à partir des champs extraits"""
+        if self.compact_items:
+            return CompactCharacterItem.from_mapping(data)
+        return FandomCharacterItem(**data)
     
     def extract_name(self, response):
         """Extrait le nom du personnage"""
@@ -256,9 +718,10 @@ class FandomSpider(scrapy.Spider):
             '.mw-parser-output h1::text',
         ]
         
-        for selector in selectors:
+        for selector in self.ordered_selectors('name', selectors):
             name = response.css(selector).get()
             if name and name.strip():
+                self.selector_hit('name', selector)
                 return name.strip()
         
         # Fallback: extraire depuis l'URL
@@ -295,10 +758,11 @@ class FandomSpider(scrapy.Spider):
             '.thumbinner img::attr(src)',
         ]
         
-        for selector in image_selectors:
+        for selector in self.ordered_selectors('image', image_selectors):
             images = response.css(selector).getall()
             for img_url in images:
                 if img_url and self.is_valid_image_url(img_url):
+                    self.selector_hit('image', selector)
                     # Convertir en URL absolue si nécessaire
                     full_url = urljoin(response.url, img_url)
                     return self.clean_image_url(full_url)
@@ -348,9 +812,10 @@ class FandomSpider(scrapy.Spider):
             '.description::text',
         ]
         
-        for selector in selectors:
+        for selector in self.ordered_selectors('description', selectors):
             desc = response.css(selector).get()
             if desc and len(desc.strip()) > 50:  # Au moins 50 caractères
+                self.selector_hit('description', selector)
                 return desc.strip()
         
         # Fallback: prendre tous les paragraphes du début
@@ -452,20 +917,48 @@ class FandomSpider(scrapy.Spider):
         """Gère les erreurs de requête"""
         error_msg = f"Request failed for {failure.request.url}: {failure.value}"
         self.logger.error(error_msg)
-        self.errors.append(error_msg)
+        
+        response = getattr(failure.value, 'response', None)
+        status = response.status if response is not None else None
+        self.errors.record(failure.type.__name__, failure.request.url, str(failure.value), status)
+        
+        # Requête ignorée avant le téléchargement (robots.txt...) : libérer sa location
+        fingerprint = failure.request.meta.get('frontier_fingerprint')
+        if self.frontier and fingerprint:
+            self.frontier.ack(fingerprint)
     
     def closed(self, reason):
         """Appelé à la fin du scraping"""
         end_time = datetime.now()
         duration = end_time - self.start_time
         
+        state = getattr(self, 'state', None)
+        if state is not None:
+            state['pages_scraped'] = self.pages_scraped
+        
+        if self.extraction_pool:
+            self.extraction_pool.shutdown()
+        
+        if self.selector_profile is not None:
+            try:
+                self.selector_profile.save()
+            except OSError as e:
+                self.logger.warning(f"Could not save selector profile: {e}")
+        
+        crawler_stats = self.crawler.stats
         stats = {
             'fandom_name': self.fandom_name,
             'fandom_url': self.fandom_url,
             'pages_scraped': self.pages_scraped,
+            'finish_reason': reason,
+            'deadline_seconds': self.deadline,
+            'items_count': crawler_stats.get_value('item_scraped_count', 0),
+            'requests_count': crawler_stats.get_value('downloader/request_count', 0),
+            'peak_memory_mb': peak_rss_mb(),
             'duration_seconds': duration.total_seconds(),
-            'errors_count': len(self.errors),
-            'errors': self.errors,
+            'errors_count': self.errors.total,
+            'errors_per_minute': self.errors.rate_per_minute(),
+            'errors': self.errors.summary(),
             'finished_at': end_time.isoformat()
         }
         
@@ -0,0 +1,175 @@
+"""
+Stockage SQLite des personnages scrapés.
+
+Les fichiers JSON `<fandom>_latest.json` doivent être chargés en entier pour
+la moindre recherche. Cette base locale garde une ligne par page (clé
+fandom + page_url) avec des index sur les colonnes interrogées par le
+frontend et une table FTS5 sur le nom et la description.
+"""
+
+import json
+import sqlite3
+
+
+# Champs stockés en JSON dans la base (listes / dictionnaires)
+JSON_FIELDS = ('categories', 'additional_images', 'infobox_data')
+
+# Colonnes simples, dans l'ordre de la table
+SCALAR_FIELDS = (
+    'fandom_name', 'page_url', 'name', 'image_url', 'description',
+    'character_type', 'attribute_1', 'attribute_2', 'fandom_url', 'scraped_at',
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS characters (
+    id INTEGER PRIMARY KEY,
+    fandom_name TEXT NOT NULL,
+    page_url TEXT NOT NULL,
+    name TEXT NOT NULL COLLATE NOCASE,
+    image_url TEXT,
+    description TEXT,
+    character_type TEXT,
+    attribute_1 TEXT,
+    attribute_2 TEXT,
+    fandom_url TEXT,
+    scraped_at TEXT,
+    categories TEXT,
+    additional_images TEXT,
+    infobox_data TEXT,
+    UNIQUE (fandom_name, page_url)
+);
+
+CREATE INDEX IF NOT EXISTS idx_characters_fandom_name
+    ON characters (fandom_name, name);
+CREATE INDEX IF NOT EXISTS idx_characters_fandom_type
+    ON characters (fandom_name, character_type);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS characters_fts USING fts5(
+    name, description, content='characters', content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS characters_ai AFTER INSERT ON characters BEGIN
+    INSERT INTO characters_fts (rowid, name, description)
+    VALUES (new.id, new.name, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS characters_ad AFTER DELETE ON characters BEGIN
+    INSERT INTO characters_fts (characters_fts, rowid, name, description)
+    VALUES ('delete', old.id, old.name, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS characters_au AFTER UPDATE ON characters BEGIN
+    INSERT INTO characters_fts (characters_fts, rowid, name, description)
+    VALUES ('delete', old.id, old.name, old.description);
+    INSERT INTO characters_fts (rowid, name, description)
+    VALUES (new.id, new.name, new.description);
+END;
+"""
+
+_COLUMNS = SCALAR_FIELDS + JSON_FIELDS
+
+UPSERT_SQL = (
+    f"INSERT INTO characters ({', '.join(_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _COLUMNS)}) "
+    "ON CONFLICT (fandom_name, page_url) DO UPDATE SET "
+    + ', '.join(f"{col} = excluded.{col}" for col in _COLUMNS[2:])
+)
+
+
+def fts_query(query):
+    """Requête FTS5 sûre : chaque terme entre guillemets, le dernier en préfixe
+
+    Les noms comme "Kai'Sa" ou "Obi-Wan" contiennent des caractères de la
+    syntaxe FTS5 ; entre guillemets, ils sont cherchés comme une phrase.
+    """
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+class CharacterStore:
+    """Petite API de lecture/écriture au-dessus de la base SQLite"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def _to_row(self, item):
+        row = [item.get(field) for field in SCALAR_FIELDS]
+        row += [json.dumps(item.get(field), ensure_ascii=False) for field in JSON_FIELDS]
+        return row
+
+    def upsert_many(self, items):
+        """Insère ou met à jour un lot d'items (dicts au format JSON habituel)"""
+        with self.conn:
+            self.conn.executemany(UPSERT_SQL, (self._to_row(item) for item in items))
+
+    def upsert(self, item):
+        self.upsert_many([item])
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def _to_item(self, row):
+        item = {field: row[field] for field in SCALAR_FIELDS}
+        for field in JSON_FIELDS:
+            item[field] = json.loads(row[field]) if row[field] else None
+        return item
+
+    def list_fandoms(self):
+        """Liste les fandoms présents avec leur nombre de personnages"""
+        rows = self.conn.execute(
+            "SELECT fandom_name, COUNT(*) AS count FROM characters GROUP BY fandom_name"
+        )
+        return [{'fandom_name': r['fandom_name'], 'count': r['count']} for r in rows]
+
+    def get(self, fandom_name, page_url):
+        row = self.conn.execute(
+            "SELECT * FROM characters WHERE fandom_name = ? AND page_url = ?",
+            (fandom_name, page_url),
+        ).fetchone()
+        return self._to_item(row) if row else None
+
+    def autocomplete(self, fandom_name, prefix, limit=10):
+        """Suggestions de noms commençant par `prefix` (parcours d'index uniquement)"""
+        rows = self.conn.execute(
+            "SELECT name, image_url, character_type, page_url FROM characters "
+            "WHERE fandom_name = ? AND name >= ? AND name < ? "
+            "ORDER BY name LIMIT ?",
+            (fandom_name, prefix, prefix + '\U0010ffff', limit),
+        )
+        return [dict(r) for r in rows]
+
+    def search(self, fandom_name, query, limit=20):
+        """Recherche plein texte sur le nom et la description (préfixe sur le dernier mot)"""
+        match = fts_query(query)
+        if not match:
+            return []
+        try:
+            rows = self.conn.execute(
+                "SELECT c.* FROM characters_fts f JOIN characters c ON c.id = f.rowid "
+                "WHERE characters_fts MATCH ? AND c.fandom_name = ? "
+                "ORDER BY rank LIMIT ?",
+                (match, fandom_name, limit),
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        return [self._to_item(r) for r in rows]
+
+    def by_type(self, fandom_name, character_type, limit=50, offset=0):
+        rows = self.conn.execute(
+            "SELECT * FROM characters WHERE fandom_name = ? AND character_type = ? "
+            "ORDER BY name LIMIT ? OFFSET ?",
+            (fandom_name, character_type, limit, offset),
+        )
+        return [self._to_item(r) for r in rows]
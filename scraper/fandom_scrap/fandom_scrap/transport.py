@@ -0,0 +1,26 @@
+"""
+Transport HTTP/2 pour les wikis Fandom (option HTTP2_ENABLED).
+
+Tous les `*.fandom.com` passent par le même CDN, qui accepte HTTP/2 : une
+seule connexion TLS par hôte suffit, les requêtes y sont multiplexées.
+Nécessite `Twisted[http2]`.
+"""
+
+from scrapy.core.downloader.handlers.http2 import H2DownloadHandler
+
+
+class FandomH2DownloadHandler(H2DownloadHandler):
+    """H2DownloadHandler qui compte les connexions ouvertes (transport/connections_opened)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        new_connection = getattr(self._pool, '_new_connection', None)
+        if new_connection is None:
+            return
+
+        def counting_new_connection(*conn_args, **conn_kwargs):
+            self._crawler.stats.inc_value('transport/connections_opened')
+            return new_connection(*conn_args, **conn_kwargs)
+
+        self._pool._new_connection = counting_new_connection
@@ -0,0 +1,58 @@
+"""
+Écritures disque des pipelines hors du thread du réacteur.
+
+Chaque pipeline confie ses ouvertures de fichiers, lots et exports finaux à
+un `BackgroundWriter` : un thread dédié qui exécute les écritures dans
+l'ordre de soumission et renvoie des Deferreds à Scrapy. La file est bornée
+(WRITER_QUEUE_SIZE) : quand elle est pleine, `process_item` renvoie un
+Deferred et le scraper attend qu'une écriture se termine au lieu de bloquer
+le réacteur, les téléchargements continuent.
+"""
+
+from twisted.internet import threads
+from twisted.internet.defer import DeferredSemaphore
+from twisted.python.threadpool import ThreadPool
+
+
+class BackgroundWriter:
+    def __init__(self, name, queue_size=100):
+        # Import tardif : ne pas installer le réacteur par défaut avant Scrapy
+        from twisted.internet import reactor
+        self.reactor = reactor
+        # Un seul thread : les écritures d'un pipeline restent ordonnées
+        self.pool = ThreadPool(minthreads=1, maxthreads=1, name=name)
+        self.semaphore = DeferredSemaphore(max(1, queue_size))
+        self.pool.start()
+        self.shutdown_trigger = self.reactor.addSystemEventTrigger('during', 'shutdown', self.pool.stop)
+
+    def submit(self, func, *args, **kwargs):
+        """Exécute `func` dans le thread d'écriture ; Deferred déclenché avec son résultat"""
+        return self.semaphore.run(threads.deferToThreadPool, self.reactor, self.pool, func, *args, **kwargs)
+
+    def submit_logged(self, spider, func, *args, **kwargs):
+        """Comme submit, l'échec éventuel étant journalisé au lieu d'être propagé"""
+        d = self.submit(func, *args, **kwargs)
+        d.addErrback(lambda failure: spider.logger.error(
+            f"Background write {getattr(func, '__name__', func)} failed: {failure.getErrorMessage()}"
+        ))
+        return d
+
+    def backpressure(self, item):
+        """L'item tel quel, ou un Deferred qui l'attend tant que la file est pleine"""
+        if self.semaphore.tokens > 0:
+            return item
+        d = self.semaphore.acquire()
+        d.addCallback(lambda semaphore: semaphore.release())
+        d.addCallback(lambda _: item)
+        return d
+
+    def stop(self):
+        """Deferred déclenché une fois toutes les écritures soumises terminées"""
+        d = self.submit(lambda: None)
+
+        def stop_pool(result):
+            self.reactor.removeSystemEventTrigger(self.shutdown_trigger)
+            self.pool.stop()
+            return result
+
+        return d.addBoth(stop_pool)
@@ -0,0 +1,164 @@
+"""
+Script de test de charge du scraper contre le faux wiki local (mock_wiki.py)
+Usage: python load_test.py [--sizes 1000 10000 100000] [--discovery categories sitemap]
+                          [--latency-ms MS] [--rate-429 R]
+
+Pour chaque taille et chaque mode de découverte (catégories, sitemap), un
+wiki de N pages est servi en local et crawlé en entier (max_pages=N) sans
+délai de politesse. Un crawl qui ne produit aucun item fait échouer le
+script. Le crawl tourne dans un
+dossier temporaire (les chemins de sortie `../data` du projet y sont
+redirigés), puis le rapport du spider donne :
+
+- items/s de bout en bout ;
+- amplification : requêtes HTTP par item produit ;
+- pic de mémoire résidente du processus Scrapy.
+"""
+
+import sys
+import os
+import json
+import time
+import shutil
+import socket
+import tempfile
+import subprocess
+import argparse
+
+
+SCRAPER_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.join(SCRAPER_DIR, 'fandom_scrap')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Mock wiki did not start on port {port}")
+
+
+def run_size(pages, discovery, args):
+    """Crawle un faux wiki de `pages` pages avec le mode `discovery` ; renvoie le rapport du spider"""
+    port = free_port()
+    server = subprocess.Popen([
+        sys.executable, os.path.join(SCRAPER_DIR, 'mock_wiki.py'),
+        '--pages', str(pages), '--port', str(port),
+        '--latency-ms', str(args.latency_ms), '--rate-429', str(args.rate_429),
+    ])
+
+    # Les pipelines écrivent dans ../data et ../../frontend/public/data
+    workdir = tempfile.mkdtemp(prefix=f'load_test_{pages}_{discovery}_')
+    crawl_dir = os.path.join(workdir, 'scraper', 'crawl')
+    os.makedirs(crawl_dir)
+
+    env = dict(os.environ)
+    env['SCRAPY_SETTINGS_MODULE'] = 'fandom_scrap.settings'
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [PROJECT_DIR, env.get('PYTHONPATH')]))
+
+    cmd = [
+        sys.executable, '-m', 'scrapy', 'crawl', 'fandom',
+        '-a', f'fandom_url=http://localhost:{port}',
+        '-a', f'max_pages={pages}',
+        '-a', f'discovery={discovery}',
+        '-s', 'DOWNLOAD_DELAY=0',
+        '-s', 'AUTOTHROTTLE_ENABLED=False',
+        '-s', f'CONCURRENT_REQUESTS={args.concurrency}',
+        '-s', f'CONCURRENT_REQUESTS_PER_DOMAIN={args.concurrency}',
+        '-s', 'LOG_LEVEL=INFO',
+        '-s', f'LOG_FILE={os.path.join(workdir, "crawl.log")}',
+    ]
+    for setting in args.setting:
+        cmd.extend(['-s', setting])
+
+    try:
+        wait_for_port(port)
+        started = time.time()
+        subprocess.run(cmd, cwd=crawl_dir, env=env, check=True)
+        wall_seconds = time.time() - started
+
+        with open(os.path.join(workdir, 'scraper', 'data', 'localhost_scraping_report.json'), 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        report['wall_seconds'] = wall_seconds
+        return report
+    finally:
+        server.terminate()
+        server.wait()
+        if args.keep_output:
+            print(f"[INFO] Sorties conservées dans {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def summarize(pages, discovery, report):
+    """Ligne de résultats d'un crawl"""
+    items = report.get('items_count') or 0
+    requests = report.get('requests_count') or 0
+    duration = report['wall_seconds']
+    return {
+        'pages': pages,
+        'discovery': discovery,
+        'items': items,
+        'requests': requests,
+        'errors': report.get('errors_count', 0),
+        'seconds': round(duration, 2),
+        'items_per_second': round(items / duration, 1) if duration else None,
+        'requests_per_item': round(requests / items, 3) if items else None,
+        'peak_memory_mb': round(report['peak_memory_mb'], 1) if report.get('peak_memory_mb') else None,
+    }
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Test de charge sur le faux wiki local')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Tailles de wiki à crawler (pages)')
+    parser.add_argument('--discovery', nargs='+', choices=['categories', 'sitemap'],
+                        default=['categories', 'sitemap'], help='Modes de découverte à tester')
+    parser.add_argument('--concurrency', type=int, default=32, help='Requêtes simultanées')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latence moyenne du faux wiki')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Proportion de réponses 429')
+    parser.add_argument('-s', '--setting', action='append', default=[], metavar='NAME=VALUE',
+                        help='Réglage Scrapy supplémentaire (répétable)')
+    parser.add_argument('--keep-output', action='store_true', help='Conserver les fichiers produits')
+    parser.add_argument('--output', help='Écrire les résultats en JSON dans ce fichier')
+
+    args = parser.parse_args()
+
+    results = []
+    for pages in args.sizes:
+        for discovery in args.discovery:
+            print(f"[INFO] Crawl d'un wiki de {pages} pages (découverte : {discovery})")
+            report = run_size(pages, discovery, args)
+            results.append(summarize(pages, discovery, report))
+
+    print()
+    print(f"{'pages':>8} {'découverte':>11} {'items':>8} {'requêtes':>9} {'erreurs':>8} {'durée (s)':>10} "
+          f"{'items/s':>8} {'req/item':>9} {'pic Mo':>8}")
+    for r in results:
+        print(f"{r['pages']:>8} {r['discovery']:>11} {r['items']:>8} {r['requests']:>9} {r['errors']:>8} "
+              f"{r['seconds']:>10} {r['items_per_second']!s:>8} {r['requests_per_item']!s:>9} "
+              f"{r['peak_memory_mb']!s:>8}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    failed = [r for r in results if not r['items']]
+    for r in failed:
+        print(f"Erreur: aucun item pour {r['pages']} pages en découverte {r['discovery']}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Faux wiki Fandom local, pour des tests de bout en bout reproductibles
+Usage: python mock_wiki.py [--pages N] [--port P] [--latency-ms MS] [--rate-429 R]
+
+Toutes les pages sont générées à la volée à partir de leur numéro et de
+--seed : le même wiki est servi à chaque lancement, sans rien stocker à part
+la liste triée des titres. Le serveur imite ce que le spider utilise :
+
+- /api.php (siteinfo : namespaces, alias et statistiques) et /robots.txt ;
+- /wiki/Special:AllPages avec plages from/to et navigation `mw-allpages-nav` ;
+- /wiki/Category:<Nom> paginées (`?from=`), avec sous-catégories ;
+- /wiki/<Titre> : infobox portable, infobox en tableau ou pas d'infobox,
+  pages sans image (--missing-images) et redirections 301 (--redirects) ;
+- /sitemap-newsitemapxml-index.xml et ses sous-sitemaps NS_0.
+
+--latency-ms ajoute un délai aléatoire (0 à 2x la valeur) à chaque réponse,
+--rate-429 renvoie une proportion de « 429 Too Many Requests ».
+
+Le spider s'y connecte directement :
+    scrapy crawl fandom -a fandom_url=http://localhost:8765
+"""
+
+import json
+import random
+import time
+import argparse
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+
+SYLLABLES = [
+    'ka', 'ri', 'to', 'an', 'mel', 'zor', 'lu', 'vi', 'sha', 'dor', 'en', 'ith',
+    'ba', 'ne', 'gar', 'os', 'qui', 'ra', 'thal', 'ul', 'wyn', 'xe', 'ya', 'fen',
+    'cor', 'ish', 'mo', 'pa', 'sel', 'ja', 'hal', 'ev',
+]
+
+CLASSES = ['Mage', 'Assassin', 'Fighter', 'Tank', 'Marksman', 'Support']
+AFFILIATIONS = ['Demacia', 'Noxus', 'Ionia', 'Freljord', 'Shurima', 'Piltover', 'Zaun']
+STATUSES = ['Alive', 'Deceased', 'Unknown']
+
+# Catégories servies ; les autres répondent 404 comme sur un vrai wiki
+CATEGORIES = {
+    'Characters': lambda i: True,
+    'Heroes': lambda i: i % 3 == 0,
+    'Villains': lambda i: i % 3 == 1,
+    'Champions': lambda i: i % 2 == 0,
+    'People': lambda i: i % 5 == 0,
+}
+SUBCATEGORIES = {'Characters': ['Heroes', 'Villains', 'Champions']}
+
+NAMESPACES = {
+    -2: 'Media', -1: 'Special', 1: 'Talk', 2: 'User', 3: 'User talk', 4: 'Mock Wiki',
+    6: 'File', 10: 'Template', 12: 'Help', 14: 'Category', 110: 'Forum', 828: 'Module',
+    1200: 'Message Wall', 500: 'User blog',
+}
+
+LIST_PAGE_SIZE = 200
+SITEMAP_PAGE_SIZE = 5000
+
+
+def slug(title):
+    return quote(title.replace(' ', '_'))
+
+
+class MockWiki:
+    """Contenu déterministe d'un wiki de `pages` pages"""
+
+    def __init__(self, pages, seed=42, missing_images=0.07, redirects=0.03):
+        self.pages = pages
+        self.seed = seed
+        self.missing_images = missing_images
+        self.redirects = redirects
+
+        rng = random.Random(seed)
+        titles = []
+        seen = set()
+        for i in range(pages):
+            first = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+            last = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).capitalize()
+            title = f"{first} {last}"
+            if title in seen:
+                title = f"{title} {i}"
+            seen.add(title)
+            titles.append(title)
+
+        # Ordre alphabétique pour AllPages, index d'origine pour le contenu
+        self.sorted_titles = sorted(titles)
+        self.index = {title: i for i, title in enumerate(titles)}
+        self.titles = titles
+        self.members = {}
+
+    def page_rng(self, i):
+        return random.Random(self.seed * 1_000_003 + i)
+
+    def is_redirect(self, i):
+        return self.page_rng(i).random() < self.redirects
+
+    def articles(self):
+        return sum(1 for i in range(self.pages) if not self.is_redirect(i))
+
+    def allpages(self, start, end):
+        """Titres de la plage [from, to] (to inclus, comme MediaWiki)"""
+        low = bisect_left(self.sorted_titles, start) if start else 0
+        high = bisect_right(self.sorted_titles, end) if end else len(self.sorted_titles)
+        return low, high
+
+    def character_page(self, i, base_url):
+        rng = self.page_rng(i)
+        rng.random()  # tirage de is_redirect
+        title = self.titles[i]
+        has_image = rng.random() >= self.missing_images
+        variant = rng.choice(('portable', 'table', 'none'))
+        image = f"{base_url}/images/{i % 97}/{slug(title)}.png/revision/latest?cb={self.seed}"
+
+        fields = {
+            'class': rng.choice(CLASSES),
+            'affiliation': rng.choice(AFFILIATIONS),
+            'status': rng.choice(STATUSES),
+            'age': str(rng.randint(12, 900)),
+        }
+
+        if variant == 'portable':
+            figure = f'<figure class="pi-item pi-image"><img src="{image}"></figure>' if has_image else ''
+            rows = ''.join(
+                f'<div class="pi-item pi-data"><h3 class="pi-data-label">{label.title()}</h3>'
+                f'<div class="pi-data-value">{value}</div></div>'
+                for label, value in fields.items()
+            )
+            infobox = f'<aside class="portable-infobox">{figure}{rows}</aside>'
+            lead_image = ''
+        elif variant == 'table':
+            image_row = f'<tr><td colspan="2"><img src="{image}"></td></tr>' if has_image else ''
+            rows = ''.join(f'<tr><th>{label.title()}</th><td>{value}</td></tr>' for label, value in fields.items())
+            infobox = f'<table class="infobox">{image_row}{rows}</table>'
+            lead_image = ''
+        else:
+            infobox = ''
+            lead_image = f'<img src="{image}">' if has_image else ''
+
+        description = (
+            f"{title} is a {fields['class'].lower()} from {fields['affiliation']}, "
+            f"known across the realm for {rng.choice(['courage', 'cunning', 'strength', 'wisdom'])} "
+            f"and a long story told in {rng.randint(2, 40)} chapters."
+        )
+        gallery = ''.join(
+            f'<figure class="thumb"><img src="{base_url}/images/{(i + n) % 97}/Gallery_{n}.jpg"></figure>'
+            for n in range(rng.randint(0, 4))
+        )
+        categories = ''.join(
+            f'<a href="/wiki/Category:{name}">{name}</a>' for name, member in CATEGORIES.items() if member(i)
+        )
+
+        return (
+            f'<!DOCTYPE html><html><head><title>{title} | Mock Wiki | Fandom</title></head><body>'
+            f'<h1 class="page-header__title">{title}</h1>'
+            f'<div class="mw-content-text">{infobox}<p>{lead_image}{description}</p>{gallery}'
+            f'<p>See also <a href="/wiki/{slug(self.titles[(i + 1) % self.pages])}">the next entry</a> '
+            f'and <a href="/wiki/{slug(title)}?action=edit">edit this page</a>.</p></div>'
+            f'<div class="page-footer__categories">{categories}</div>'
+            f'</body></html>'
+        )
+
+    def allpages_page(self, start, end):
+        low, high = self.allpages(start, end)
+        titles = self.sorted_titles[low:min(high, low + LIST_PAGE_SIZE)]
+        links = ''.join(f'<li><a href="/wiki/{slug(t)}">{t}</a></li>' for t in titles)
+        nav = ''
+        if low + LIST_PAGE_SIZE < high:
+            # Comme MediaWiki, la navigation ne reporte pas `to`
+            params = f"from={quote(self.sorted_titles[low + LIST_PAGE_SIZE])}"
+            nav = f'<div class="mw-allpages-nav"><a href="/wiki/Special:AllPages?{params}">Next page</a></div>'
+        return (
+            '<!DOCTYPE html><html><body><h1 class="page-header__title">All pages</h1>'
+            f'{nav}<div class="mw-content-text"><ul class="mw-allpages-chunk">{links}</ul></div>{nav}'
+            '</body></html>'
+        )
+
+    def category_page(self, name, start):
+        if name not in self.members:
+            member = CATEGORIES[name]
+            self.members[name] = [t for t in self.sorted_titles if member(self.index[t])]
+        members = self.members[name]
+        low = bisect_left(members, start) if start else 0
+        chunk = members[low:low + LIST_PAGE_SIZE]
+
+        links = ''.join(
+            f'<li class="category-page__member"><a href="/wiki/Category:{sub}">Category:{sub}</a></li>'
+            for sub in (SUBCATEGORIES.get(name, []) if not start else [])
+        )
+        links += ''.join(
+            f'<li class="category-page__member"><a href="/wiki/{slug(t)}">{t}</a></li>' for t in chunk
+        )
+        pagination = ''
+        if low + LIST_PAGE_SIZE < len(members):
+            pagination = (
+                f'<a class="category-page__pagination-next" '
+                f'href="/wiki/Category:{name}?from={quote(members[low + LIST_PAGE_SIZE])}">Next</a>'
+            )
+        return (
+            f'<!DOCTYPE html><html><body><h1 class="page-header__title">Category:{name}</h1>'
+            f'<div class="category-page__members"><ul>{links}</ul></div>{pagination}'
+            '</body></html>'
+        )
+
+    def siteinfo(self):
+        namespaces = {'0': {'id': 0, '*': ''}}
+        for ns_id, name in NAMESPACES.items():
+            namespaces[str(ns_id)] = {'id': ns_id, '*': name, 'canonical': name}
+        return {'query': {
+            'namespaces': namespaces,
+            'namespacealiases': [{'id': 6, '*': 'Image'}],
+            'statistics': {'articles': self.articles(), 'pages': self.pages},
+        }}
+
+    def sitemap_index(self, base_url):
+        count = max(1, -(-self.pages // SITEMAP_PAGE_SIZE))
+        entries = ''.join(
+            f'<sitemap><loc>{base_url}/sitemap-newsitemapxml-NS_0-p{n + 1}.xml</loc></sitemap>'
+            for n in range(count)
+        )
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>')
+
+    def sitemap(self, number, base_url):
+        start = (number - 1) * SITEMAP_PAGE_SIZE
+        entries = ''.join(
+            f'<url><loc>{base_url}/wiki/{slug(self.titles[i])}</loc>'
+            f'<lastmod>{2020 + i % 5}-0{1 + i % 9}-1{i % 10}</lastmod></url>'
+            for i in range(start, min(self.pages, start + SITEMAP_PAGE_SIZE))
+        )
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>')
+
+
+def make_handler(wiki, latency_ms=0, rate_429=0.0):
+    class MockWikiHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def send(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+            body = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if latency_ms:
+                time.sleep(random.uniform(0, 2 * latency_ms) / 1000)
+            if rate_429 and random.random() < rate_429:
+                self.send(429, 'Too Many Requests', 'text/plain', {'Retry-After': '1'})
+                return
+
+            parsed = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+            base_url = f"http://{self.headers.get('Host', 'localhost')}"
+            path = unquote(parsed.path)
+
+            if path == '/robots.txt':
+                self.send(200, 'User-agent: *\nAllow: /\n', 'text/plain')
+            elif path == '/api.php':
+                self.send(200, json.dumps(wiki.siteinfo()), 'application/json')
+            elif path == '/sitemap-newsitemapxml-index.xml':
+                self.send(200, wiki.sitemap_index(base_url), 'application/xml')
+            elif path.startswith('/sitemap-newsitemapxml-NS_0-p'):
+                number = int(path[len('/sitemap-newsitemapxml-NS_0-p'):-len('.xml')])
+                self.send(200, wiki.sitemap(number, base_url), 'application/xml')
+            elif path == '/wiki/Special:AllPages':
+                self.send(200, wiki.allpages_page(params.get('from'), params.get('to')))
+            elif path.startswith('/wiki/Category:'):
+                name = path[len('/wiki/Category:'):].replace('_', ' ')
+                if name in CATEGORIES:
+                    self.send(200, wiki.category_page(name, params.get('from')))
+                else:
+                    self.send(404, '<html><body>No such category</body></html>')
+            elif path.startswith('/wiki/'):
+                i = wiki.index.get(path[len('/wiki/'):].replace('_', ' '))
+                if i is None:
+                    self.send(404, '<html><body>There is currently no text in this page.</body></html>')
+                elif wiki.is_redirect(i):
+                    target = f"/wiki/{slug(wiki.titles[(i + 1) % wiki.pages])}"
+                    self.send(301, '', headers={'Location': target})
+                else:
+                    self.send(200, wiki.character_page(i, base_url))
+            else:
+                self.send(404, 'Not found', 'text/plain')
+
+    return MockWikiHandler
+
+
+def serve(pages, port, seed=42, missing_images=0.07, redirects=0.03, latency_ms=0, rate_429=0.0):
+    wiki = MockWiki(pages, seed=seed, missing_images=missing_images, redirects=redirects)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(wiki, latency_ms, rate_429))
+    server.daemon_threads = True
+    print(f"[INFO] Mock wiki: {pages} pages sur http://localhost:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Faux wiki Fandom local')
+    parser.add_argument('--pages', type=int, default=1000, help='Nombre de pages du wiki')
+    parser.add_argument('--port', type=int, default=8765, help="Port d'écoute")
+    parser.add_argument('--seed', type=int, default=42, help='Graine de génération du contenu')
+    parser.add_argument('--missing-images', type=float, default=0.07, help='Proportion de pages sans image')
+    parser.add_argument('--redirects', type=float, default=0.03, help='Proportion de redirections 301')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latence moyenne ajoutée à chaque réponse')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Proportion de réponses 429')
+
+    args = parser.parse_args()
+    serve(args.pages, args.port, args.seed, args.missing_images, args.redirects, args.latency_ms, args.rate_429)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Script pour ré-extraire les fiches depuis une archive WARC, sans réseau
+Usage: python reextract.py <archive.warc.gz> [--processes N]
+
+L'archive est produite par un crawl lancé avec --archive (run_scraper.py).
+Les pages sont rejouées par le spider habituel (mêmes extracteurs, mêmes
+pipelines et fichiers de sortie), sans délai de politesse, l'extraction
+étant répartie sur plusieurs processus.
+"""
+
+import sys
+import os
+import json
+import subprocess
+import argparse
+from urllib.parse import urlsplit
+
+
+# Callbacks des fiches personnage enregistrées dans l'index
+CHARACTER_CALLBACKS = ('parse_character_page', 'parse_character_page_pooled')
+
+
+def fandom_url_from_index(index_path):
+    """URL du wiki : en-tête warcinfo, sinon déduite de la première fiche archivée"""
+    with open(index_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry.get('type') == 'warcinfo' and entry.get('fandom_url'):
+                return entry['fandom_url'].rstrip('/')
+            # Archives sans warcinfo (robots.txt et catégories passent avant les fiches)
+            if entry.get('callback') in CHARACTER_CALLBACKS:
+                parts = urlsplit(entry['url'])
+                return f"{parts.scheme}://{parts.netloc}{parts.path.split('/wiki/')[0]}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ré-extrait les fiches d'une archive WARC")
+    parser.add_argument('archive', help='Archive .warc.gz produite avec --archive')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help="Nombre de processus d'extraction")
+
+    args = parser.parse_args()
+
+    archive_path = os.path.abspath(args.archive)
+    index_path = f"{archive_path[:-len('.warc.gz')]}.cdx.jsonl"
+    if not archive_path.endswith('.warc.gz') or not os.path.exists(index_path):
+        print(f"Erreur: archive ou index introuvable: {archive_path}")
+        sys.exit(1)
+
+    fandom_url = fandom_url_from_index(index_path)
+    if not fandom_url:
+        print(f"Erreur: aucune fiche personnage dans l'archive: {archive_path}")
+        sys.exit(1)
+
+    cmd = [
+        'scrapy', 'crawl', 'fandom',
+        '-a', f'fandom_url={fandom_url}',
+        '-a', f'replay_archive={archive_path}',
+        # Hors ligne : ni robots.txt, ni délai de politesse
+        '-s', 'ROBOTSTXT_OBEY=False',
+        '-s', 'DOWNLOAD_DELAY=0',
+        '-s', 'AUTOTHROTTLE_ENABLED=False',
+        '-s', f'CONCURRENT_REQUESTS={args.processes * 4}',
+        '-s', f'CONCURRENT_REQUESTS_PER_DOMAIN={args.processes * 4}',
+        '-s', f'EXTRACTION_PROCESSES={args.processes}',
+    ]
+
+    print(f"[INFO] Ré-extraction de {archive_path} ({args.processes} processus)")
+
+    try:
+        os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fandom_scrap'))
+        subprocess.run(cmd, check=True)
+        print("[SUCCESS] Ré-extraction terminée avec succès!")
+    except subprocess.CalledProcessError as e:
+        print(f"Erreur lors de la ré-extraction: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nRé-extraction interrompue par l'utilisateur")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,21 @@
 """
 Script pour lancer le scraper Fandom avec différents paramètres
-Usage: python run_scraper.py <fandom_url> [max_pages]
+Usage: python run_scraper.py <fandom_url> [--max-pages N] [--deadline SECONDES] [--job NAME]
+       python run_scraper.py --resume NAME
 """
 
 import sys
 import os
+import json
 import subprocess
 import argparse
 from urllib.parse import urlparse
 
 
+# Dossier des jobs reprenables (JOBDIR Scrapy), relatif au dossier scraper
+JOBS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs')
+
+
 def validate_fandom_url(url):
     """Valide qu'une URL est bien un wiki Fandom"""
     try:
@@ -21,14 +27,66 @@ def validate_fandom_url(url):
         return False, f"URL invalide: {e}"
 
 
+def positive_int(value):
+    """Type argparse : entier strictement positif"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"entier attendu : {value}")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"doit être strictement positif : {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(description="Lance le scraper Fandom")
-    parser.add_argument('fandom_url', help='URL du wiki Fandom à scraper')
+    parser.add_argument('fandom_url', nargs='?', help='URL du wiki Fandom à scraper')
     parser.add_argument('--max-pages', type=int, help='Nombre maximum de pages à scraper')
+    parser.add_argument('--deadline', type=int, metavar='SECONDES',
+                        help='Budget de temps : la découverte s\'arrête avant, les items déjà extraits sont gardés')
     parser.add_argument('--output-dir', default='../data', help='Dossier de sortie pour les données')
+    parser.add_argument('--shard-size', type=positive_int, help='Écrire aussi la sortie en shards de N items (+ manifest)')
+    parser.add_argument('--discovery', choices=['categories', 'sitemap'], default='categories',
+                        help='Découverte des pages : catégories (défaut) ou sitemap XML du wiki')
+    parser.add_argument('--since', help='Avec --discovery sitemap : ignorer les pages non modifiées depuis cette date (YYYY-MM-DD)')
+    parser.add_argument('--frontier', metavar='URL',
+                        help='Frontière partagée (sqlite:///chemin.db ou redis://hote:port/0) pour crawler à plusieurs')
+    parser.add_argument('--http2', action='store_true',
+                        help='Transport HTTP/2 multiplexé + encodages br/zstd (Twisted[http2], brotli, zstandard)')
+    parser.add_argument('--archive', action='store_true',
+                        help='Enregistrer les réponses brutes en WARC (ré-extraction hors ligne avec reextract.py)')
+    parser.add_argument('--memory-budget', type=int, metavar='MB',
+                        help='Budget mémoire (RSS) : la découverte est mise en pause au-delà')
+    parser.add_argument('--job', help='Nom du job : sauvegarde la file, les pages vues et les items pour reprise')
+    parser.add_argument('--resume', metavar='JOB', help='Reprendre un job interrompu')
     
     args = parser.parse_args()
     
+    # Reprise : relire les paramètres du job
+    job_name = args.resume or args.job
+    job_dir = os.path.abspath(os.path.join(JOBS_DIR, job_name)) if job_name else None
+    job_file = os.path.join(job_dir, 'job.json') if job_dir else None
+    
+    if args.resume:
+        if not os.path.exists(job_file):
+            print(f"Erreur: job introuvable: {job_dir}")
+            sys.exit(1)
+        with open(job_file, 'r', encoding='utf-8') as f:
+            job = json.load(f)
+        args.fandom_url = job['fandom_url']
+        args.max_pages = job.get('max_pages')
+        args.deadline = job.get('deadline')
+        args.shard_size = job.get('shard_size')
+        args.discovery = job.get('discovery', 'categories')
+        args.since = job.get('since')
+        args.frontier = job.get('frontier')
+        args.http2 = job.get('http2', False)
+        args.archive = job.get('archive', False)
+        args.memory_budget = job.get('memory_budget')
+    
+    if not args.fandom_url:
+        parser.error("fandom_url est requis (sauf avec --resume)")
+    
     # Validation de l'URL
     valid, error_msg = validate_fandom_url(args.fandom_url)
     if not valid:
@@ -38,6 +96,22 @@ def main():
     # Créer le dossier de sortie
     os.makedirs(args.output_dir, exist_ok=True)
     
+    if args.job:
+        os.makedirs(job_dir, exist_ok=True)
+        with open(job_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fandom_url': args.fandom_url,
+                'max_pages': args.max_pages,
+                'deadline': args.deadline,
+                'shard_size': args.shard_size,
+                'discovery': args.discovery,
+                'since': args.since,
+                'frontier': args.frontier,
+                'http2': args.http2,
+                'archive': args.archive,
+                'memory_budget': args.memory_budget,
+            }, f, indent=2)
+    
     # Construire la commande Scrapy
     cmd = [
         'scrapy', 'crawl', 'fandom',
@@ -47,10 +121,45 @@ def main():
     if args.max_pages:
         cmd.extend(['-a', f'max_pages={args.max_pages}'])
     
+    if args.deadline:
+        cmd.extend(['-a', f'deadline={args.deadline}'])
+    
+    if args.discovery != 'categories':
+        cmd.extend(['-a', f'discovery={args.discovery}'])
+    
+    if args.since:
+        cmd.extend(['-a', f'sitemap_since={args.since}'])
+    
+    if args.shard_size:
+        cmd.extend(['-s', 'OUTPUT_SHARDED=True', '-s', f'OUTPUT_SHARD_SIZE={args.shard_size}'])
+    
+    if args.http2:
+        cmd.extend(['-s', 'HTTP2_ENABLED=True'])
+    
+    if args.memory_budget:
+        cmd.extend(['-s', f'MEMORY_BUDGET_MB={args.memory_budget}'])
+    
+    if args.archive:
+        cmd.extend(['-s', 'ARCHIVE_ENABLED=True'])
+    
+    if args.frontier:
+        cmd.extend([
+            '-s', 'SCHEDULER=fandom_scrap.frontier.SharedFrontierScheduler',
+            '-s', f'FRONTIER_URL={args.frontier}',
+        ])
+    
+    # JOBDIR : Scrapy persiste la file du scheduler, les requêtes vues et spider.state
+    if job_dir:
+        cmd.extend(['-s', f'JOBDIR={job_dir}'])
+    
     # Lancer le scraper
     print(f"[INFO] Demarrage du scraping de {args.fandom_url}")
     if args.max_pages:
         print(f"[INFO] Limite: {args.max_pages} pages")
+    if args.deadline:
+        print(f"[INFO] Budget de temps: {args.deadline} s")
+    if args.resume:
+        print(f"[INFO] Reprise du job {args.resume}")
     
     try:
         # Changer vers le dossier du projet Scrapy
@@ -64,6 +173,8 @@ def main():
         sys.exit(1)
     except KeyboardInterrupt:
         print("\nScraping interrompu par l'utilisateur")
+        if job_name:
+            print(f"[INFO] Reprendre avec: python run_scraper.py --resume {job_name}")
         sys.exit(1)
 
 
@@ -22,6 +22,9 @@ TEST_FANDOMS = [
     "https://zelda.fandom.com/",
 ]
 
+# Budget de temps du crawl : il s'arrête proprement avant le timeout de 10 min
+CRAWL_DEADLINE = 540
+
 
 def test_fandom(fandom_url, max_pages=50):
     """Teste un fandom spécifique"""
@@ -32,7 +35,8 @@ def test_fandom(fandom_url, max_pages=50):
     # Lancer le scraper avec limite de pages pour les tests
     cmd = [
         'python', 'run_scraper.py', fandom_url,
-        '--max-pages', str(max_pages)
+        '--max-pages', str(max_pages),
+        '--deadline', str(CRAWL_DEADLINE)
     ]
     
     try:
@@ -0,0 +1,10 @@
+import os
+import sys
+
+
+SCRAPER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Le paquet fandom_scrap d'abord (le dossier scraper/fandom_scrap n'est pas un paquet),
+# puis les scripts de scraper/ (reextract, mock_wiki, load_test)
+sys.path.insert(0, os.path.join(SCRAPER_DIR, 'fandom_scrap'))
+sys.path.append(SCRAPER_DIR)
@@ -0,0 +1,64 @@
+import math
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from scrapy.http import HtmlResponse
+
+from fandom_scrap.spiders.fandom_spider import FandomSpider
+from mock_wiki import LIST_PAGE_SIZE, MockWiki
+
+
+BASE_URL = 'http://localhost:8765'
+
+
+def crawl_partition(spider, wiki, request, honour_to=True):
+    """Suit la pagination d'une partition ; renvoie le nombre de requêtes AllPages"""
+    requests = 0
+    while request is not None:
+        requests += 1
+        query = parse_qs(urlparse(request.url).query)
+        start = query.get('from', [None])[0]
+        end = query.get('to', [None])[0] if honour_to else None
+        response = HtmlResponse(
+            request.url, body=wiki.allpages_page(start, end).encode('utf-8'), encoding='utf-8'
+        )
+        request = next(
+            (r for r in spider.parse_category_page(response) if 'Special:AllPages' in r.url),
+            None,
+        )
+        assert requests <= len(wiki.sorted_titles), 'pagination sans fin'
+    return requests
+
+
+@pytest.mark.parametrize('honour_to', [True, False])
+def test_allpages_requests_per_partition(honour_to):
+    wiki = MockWiki(3000, redirects=0)
+    spider = FandomSpider(fandom_url=BASE_URL)
+
+    partitions = list(spider.allpages_requests(4))
+    assert len(partitions) == 4
+    for request in partitions:
+        query = parse_qs(urlparse(request.url).query)
+        low, high = wiki.allpages(query.get('from', [None])[0], query.get('to', [None])[0])
+        expected = max(1, math.ceil((high - low) / LIST_PAGE_SIZE))
+        requests = crawl_partition(spider, wiki, request, honour_to)
+        if honour_to:
+            assert requests == expected
+        else:
+            # Serveur qui ignore `to` : arrêt dès que `from` dépasse la borne
+            assert requests <= expected + 1
+
+
+def test_allpages_next_link_keeps_partition_end():
+    spider = FandomSpider(fandom_url=BASE_URL)
+    body = (
+        '<html><body><div class="mw-allpages-nav">'
+        '<a href="/wiki/Special:AllPages?from=Go">Next page</a></div></body></html>'
+    )
+
+    def next_link(url):
+        return spider.allpages_next_link(HtmlResponse(url, body=body.encode('utf-8'), encoding='utf-8'))
+
+    assert next_link(f'{BASE_URL}/wiki/Special:AllPages?from=Da') == '/wiki/Special:AllPages?from=Go'
+    assert next_link(f'{BASE_URL}/wiki/Special:AllPages?from=Da&to=K') == '/wiki/Special:AllPages?from=Go&to=K'
+    assert next_link(f'{BASE_URL}/wiki/Special:AllPages?from=Da&to=G') is None
@@ -0,0 +1,179 @@
+import json
+import pickle
+from types import SimpleNamespace
+
+import pytest
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from scrapy.utils.request import request_from_dict
+from scrapy.utils.test import get_crawler
+
+from fandom_scrap.backpressure import MemoryBackpressure
+from fandom_scrap.frontier import SharedFrontierScheduler, SqliteFrontier, dump_request, load_request
+from fandom_scrap.spiders.fandom_spider import FandomSpider
+
+
+BASE_URL = 'http://localhost:8765'
+
+
+class Evil:
+    def __reduce__(self):
+        return (exec, ("raise SystemExit('pickle payload executed')",))
+
+
+@pytest.fixture
+def spider():
+    return FandomSpider(fandom_url=BASE_URL)
+
+
+def test_request_round_trip_as_json(spider):
+    request = Request(
+        f'{BASE_URL}/wiki/Ahri',
+        method='POST',
+        body=b'\x00\xff binary body',
+        headers={'X-Test': 'caf\xe9'.encode('latin-1')},
+        callback=spider.parse_category_page,
+        errback=spider.handle_error,
+        priority=-3,
+        meta={'archive_record': ('/tmp/a.warc.gz', 10, 20), 'dont_cache': True},
+    )
+    payload = dump_request(request.to_dict(spider=spider))
+    json.loads(payload)  # JSON pur
+
+    restored = request_from_dict(load_request(payload), spider=spider)
+    assert restored.url == request.url
+    assert restored.body == request.body
+    assert restored.headers.getlist('X-Test') == request.headers.getlist('X-Test')
+    assert restored.callback == spider.parse_category_page
+    assert restored.errback == spider.handle_error
+    assert restored.priority == -3
+    assert restored.meta['dont_cache'] is True
+    assert list(restored.meta['archive_record']) == ['/tmp/a.warc.gz', 10, 20]
+
+
+def test_pickle_payload_is_not_executed():
+    with pytest.raises(ValueError):
+        load_request(pickle.dumps(Evil()))
+
+
+def test_sqlite_frontier_lease_and_ack(tmp_path, spider):
+    frontier = SqliteFrontier(str(tmp_path / 'frontier.db'), 'localhost')
+    payload = dump_request(Request(f'{BASE_URL}/wiki/Ahri').to_dict(spider=spider))
+    assert frontier.push('a', 0, payload)
+    assert not frontier.push('a', 0, payload)
+
+    fingerprint, leased = frontier.lease('worker-1', 300, 3)
+    assert fingerprint == 'a'
+    assert request_from_dict(load_request(leased), spider=spider).url == f'{BASE_URL}/wiki/Ahri'
+    assert frontier.lease('worker-2', 300, 3) is None
+    assert frontier.pending() == 1
+
+    frontier.ack('a')
+    assert frontier.pending() == 0
+    frontier.close()
+
+
+class CountingFrontier(SqliteFrontier):
+    """Compte les lectures du compteur global de pages"""
+
+    reads = 0
+
+    def pages(self):
+        self.reads += 1
+        return super().pages()
+
+
+def test_page_budget_read_once_per_category_page(tmp_path, spider):
+    links = ''.join(f'<li class="category-page__member"><a href="/wiki/Page_{i}">Page {i}</a></li>' for i in range(50))
+    page = HtmlResponse(
+        f'{BASE_URL}/wiki/Category:Characters',
+        body=f'<html><body><ul>{links}</ul></body></html>'.encode('utf-8'),
+        encoding='utf-8',
+    )
+    spider.max_pages = 10
+    spider.frontier = CountingFrontier(str(tmp_path / 'frontier.db'), 'localhost')
+
+    requests = list(spider.parse_category_page(page))
+    assert len(requests) == 50
+    assert spider.frontier.reads == 1
+
+    # Budget atteint par un autre worker : relu à la page suivante
+    for _ in range(10):
+        spider.frontier.incr_pages()
+    assert list(spider.parse_category_page(page)) == []
+    spider.frontier.close()
+
+
+@pytest.fixture
+def redis_frontier(monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    from fandom_scrap import frontier as frontier_module
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        frontier_module.redis.Redis, 'from_url', lambda url: fakeredis.FakeRedis(server=server)
+    )
+    return frontier_module.RedisFrontier('redis://localhost:6379/0', 'localhost')
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def test_redis_lease_is_recorded_with_the_pop(redis_frontier, monkeypatch):
+    from fandom_scrap import frontier as frontier_module
+
+    clock = Clock()
+    monkeypatch.setattr(frontier_module.time, 'time', clock.time)
+    redis_frontier.push('low', 0, '{"url":"low"}')
+    redis_frontier.push('high', 5, '{"url":"high"}')
+
+    assert redis_frontier.lease('worker-1', 300, 3) == ('high', b'{"url":"high"}')
+    client = redis_frontier.client
+    # La requête sortie de la file est déjà louée : rien n'est perdu si le worker meurt
+    assert client.zscore(redis_frontier.key('leases'), 'high') == 1300
+    assert client.zrange(redis_frontier.key('queue'), 0, -1) == [b'low']
+    assert redis_frontier.pending() == 2
+
+
+def test_redis_expired_lease_is_redistributed_then_dropped(redis_frontier, monkeypatch):
+    from fandom_scrap import frontier as frontier_module
+
+    clock = Clock()
+    monkeypatch.setattr(frontier_module.time, 'time', clock.time)
+    redis_frontier.push('a', 0, '{"url":"a"}')
+
+    # Deux workers meurent l'un après l'autre sans acquitter
+    for worker in ('worker-1', 'worker-2'):
+        assert redis_frontier.lease(worker, 300, 2) == ('a', b'{"url":"a"}')
+        assert redis_frontier.lease('other', 300, 2) is None
+        clock.now += 301
+
+    # Tentatives épuisées : abandonnée
+    assert redis_frontier.lease('worker-3', 300, 2) is None
+    assert redis_frontier.pending() == 0
+
+
+def test_redis_acked_entries_are_skipped(redis_frontier):
+    redis_frontier.push('a', 1, '{"url":"a"}')
+    redis_frontier.push('b', 0, '{"url":"b"}')
+    redis_frontier.ack('a')
+    assert redis_frontier.lease('worker-1', 300, 3) == ('b', b'{"url":"b"}')
+
+
+def test_backpressure_reads_shared_frontier_size(tmp_path, spider):
+    crawler = get_crawler(FandomSpider, {'FRONTIER_URL': f"sqlite:///{tmp_path / 'frontier.db'}"})
+    scheduler = SharedFrontierScheduler(crawler)
+    scheduler.open(spider)
+    for i in range(3):
+        scheduler.enqueue_request(Request(f'{BASE_URL}/wiki/Page_{i}'))
+
+    crawler.engine = SimpleNamespace(_slot=SimpleNamespace(scheduler=scheduler))
+    assert len(scheduler) == 3
+    assert MemoryBackpressure(crawler).queue_size() == 3
+    scheduler.close('finished')
@@ -0,0 +1,25 @@
+from fandom_scrap.namespaces import LinkClassifier
+
+
+def test_absolute_url_with_port():
+    classifier = LinkClassifier('http://localhost:8765')
+    assert classifier.is_article('http://localhost:8765/wiki/Foo')
+    assert classifier.is_article('/wiki/Foo')
+    assert not classifier.is_article('http://localhost:8765/wiki/Category:Foo')
+    assert not classifier.is_article('http://localhost:9999/wiki/Foo')
+    assert not classifier.is_article('http://localhost/wiki/Foo')
+
+
+def test_absolute_url_without_port():
+    classifier = LinkClassifier('https://starwars.fandom.com')
+    assert classifier.is_article('https://starwars.fandom.com/wiki/Luke_Skywalker')
+    assert classifier.is_article('//starwars.fandom.com/wiki/Luke_Skywalker')
+    assert not classifier.is_article('https://starwars.fandom.com/wiki/Luke_Skywalker?action=edit')
+    assert not classifier.is_article('https://other.fandom.com/wiki/Luke_Skywalker')
+
+
+def test_language_path_and_localised_namespaces():
+    classifier = LinkClassifier('https://naruto.fandom.com/fr', ['Catégorie'])
+    assert classifier.is_article('https://naruto.fandom.com/fr/wiki/Naruto_Uzumaki')
+    assert not classifier.is_article('/fr/wiki/Cat%C3%A9gorie:Personnages')
+    assert not classifier.is_article('/wiki/Naruto_Uzumaki')
@@ -0,0 +1,70 @@
+from twisted.internet import defer
+
+from fandom_scrap import pipelines
+from fandom_scrap.pipelines import JsonWriterPipeline
+
+
+class RecordingWriter:
+    """Thread d'écriture remplacé par un enregistrement des snapshots soumis"""
+
+    def __init__(self, fired=True):
+        self.snapshots = []
+        self.fired = fired
+
+    def submit_logged(self, spider, func, spider_arg, snapshot):
+        self.snapshots.append(snapshot['items_count'])
+        # fired=False : l'écriture ne se termine jamais (disque lent)
+        return defer.succeed(None) if self.fired else defer.Deferred()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+def crawl(monkeypatch, items, items_per_second, writer=None, max_interval=60.0):
+    clock = Clock()
+    monkeypatch.setattr(pipelines.time, 'monotonic', clock.monotonic)
+    pipeline = JsonWriterPipeline()
+    pipeline.partial_enabled = True
+    pipeline.partial_max_interval = max_interval
+    pipeline.background = writer or RecordingWriter()
+    for i in range(items):
+        clock.now = i / items_per_second
+        pipeline.items.append({'page_url': f'/wiki/{i}'})
+        pipeline.maybe_publish_partial(spider=None)
+    return pipeline.background.snapshots
+
+
+def test_first_item_published_immediately(monkeypatch):
+    assert crawl(monkeypatch, 1, items_per_second=10) == [1]
+
+
+def test_total_snapshot_size_linear_in_items(monkeypatch):
+    # Crawl rapide : 50 items/s, 100 000 items, sans plafond de temps
+    snapshots = crawl(monkeypatch, 100_000, items_per_second=50, max_interval=0)
+    assert sum(snapshots) <= 6 * 100_000
+    assert all(later >= earlier * 1.25 for earlier, later in zip(snapshots[1:], snapshots[2:]))
+
+
+def test_max_interval_keeps_slow_crawls_published(monkeypatch):
+    # Crawl lent : 1 item/s pendant une heure, le seuil de 25 % n'est plus atteint
+    # qu'après plusieurs minutes ; le plafond de 60 s reprend la main
+    snapshots = crawl(monkeypatch, 3_600, items_per_second=1)
+    assert len(snapshots) >= 3_600 // 60 - 1
+    assert all(later - earlier <= 61 for earlier, later in zip(snapshots, snapshots[1:]))
+    # Sans plafond, beaucoup moins de publications
+    assert len(crawl(monkeypatch, 3_600, items_per_second=1, max_interval=0)) < len(snapshots) // 3
+
+
+def test_interval_is_a_minimum_between_snapshots(monkeypatch):
+    # 1 000 items/s : le seuil en items est atteint bien avant l'intervalle de 10 s
+    snapshots = crawl(monkeypatch, 5_000, items_per_second=1_000)
+    assert snapshots == [1]
+
+
+def test_one_snapshot_in_flight(monkeypatch):
+    assert crawl(monkeypatch, 500, items_per_second=1, writer=RecordingWriter(fired=False)) == [1]
@@ -0,0 +1,119 @@
+import json
+
+from scrapy.http import HtmlResponse
+
+from fandom_scrap import extraction_pool
+from fandom_scrap.profiles import SelectorProfile
+from fandom_scrap.spiders.fandom_spider import FandomSpider
+from mock_wiki import MockWiki
+
+
+BASE_URL = 'http://localhost:8765'
+
+INFOBOX_IMAGE = '.portable-infobox img::attr(src)'
+LEAD_IMAGE = '.mw-content-text p:first-of-type img::attr(src)'
+
+# Page avec une infobox et une image en tête d'article
+PAGE_WITH_BOTH = f"""<html><body><h1 class="page-header__title">Ahri</h1>
+<div class="mw-content-text">
+<aside class="portable-infobox"><figure><img src="{BASE_URL}/images/Ahri_infobox.png"></figure></aside>
+<p><img src="{BASE_URL}/images/Lead_scene.jpg">Ahri is a vastaya who can reshape magic into orbs of raw destructive energy.</p>
+</div></body></html>"""
+
+
+def response(url, body):
+    return HtmlResponse(url, body=body.encode('utf-8'), encoding='utf-8')
+
+
+def spider(profile=None):
+    spider = FandomSpider(fandom_url=BASE_URL)
+    spider.selector_profile = profile
+    return spider
+
+
+def learned_profile(tmp_path):
+    """Profil tel qu'issu d'un crawl du faux wiki : l'image de tête gagne plus souvent"""
+    path = tmp_path / 'localhost.json'
+    path.write_text(json.dumps({'fields': {'image': {LEAD_IMAGE: 144, INFOBOX_IMAGE: 138}}}))
+    return SelectorProfile(str(path), 'localhost')
+
+
+def without_date(item):
+    return {key: value for key, value in dict(item).items() if key != 'scraped_at'}
+
+
+def test_profile_keeps_cascade_precedence(tmp_path):
+    page = response(f'{BASE_URL}/wiki/Ahri', PAGE_WITH_BOTH)
+    profile = learned_profile(tmp_path)
+
+    assert spider(profile).extract_main_image(page) == spider().extract_main_image(page)
+    assert spider(profile).extract_main_image(page) == f'{BASE_URL}/images/Ahri_infobox.png'
+    # Le gain revient au sélecteur qui gagne dans l'ordre d'origine
+    assert profile.hits['image'][INFOBOX_IMAGE] == 140
+    assert profile.hits['image'][LEAD_IMAGE] == 144
+
+
+def test_profile_does_not_change_extracted_items(tmp_path):
+    wiki = MockWiki(60, missing_images=0.1, redirects=0)
+    pages = [
+        response(f'{BASE_URL}/wiki/{wiki.titles[i].replace(" ", "_")}', wiki.character_page(i, BASE_URL))
+        for i in range(60)
+    ]
+    profile = learned_profile(tmp_path)
+
+    plain = [spider().extract_character(page) for page in pages]
+    # Deux passes : la seconde utilise l'ordre appris pendant la première
+    profiled = spider(profile)
+    for _ in range(2):
+        learned = [profiled.extract_character(page) for page in pages]
+        assert [item and without_date(item) for item in learned] == [item and without_date(item) for item in plain]
+
+
+def test_unknown_selectors_tried_last():
+    profile = SelectorProfile()
+    profile.record('name', 'h1::text')
+    assert profile.order('name', ['h1.title::text', 'h1::text', '.page-title::text']) == [
+        'h1::text', 'h1.title::text', '.page-title::text',
+    ]
+    profile.record('name', '.page-title::text')
+    assert profile.order('name', ['h1.title::text', 'h1::text', '.page-title::text']) == [
+        'h1::text', '.page-title::text', 'h1.title::text',
+    ]
+
+
+def test_category_page_takes_union_of_selectors(tmp_path):
+    page = response(f'{BASE_URL}/wiki/Category:Characters', """<html><body>
+<div class="category-page__members"><a href="/wiki/Ahri">Ahri</a></div>
+<table class="wikitable"><tr><td><a href="/wiki/Kai%27Sa">Kai'Sa</a></td></tr></table>
+</body></html>""")
+    profiled = spider(learned_profile(tmp_path))
+    urls = {request.url for request in profiled.parse_category_page(page)}
+    assert {f'{BASE_URL}/wiki/Ahri', f'{BASE_URL}/wiki/Kai%27Sa'} <= urls
+
+
+def test_pool_worker_returns_selector_hits(tmp_path):
+    profile = learned_profile(tmp_path)
+    extraction_pool._init_worker(BASE_URL, 'localhost', profile.path)
+
+    data, hits = extraction_pool._extract(f'{BASE_URL}/wiki/Ahri', PAGE_WITH_BOTH.encode('utf-8'), 'utf-8')
+
+    assert data['image_url'] == f'{BASE_URL}/images/Ahri_infobox.png'
+    assert ('image', INFOBOX_IMAGE) in hits
+    assert ('name', 'h1.page-header__title::text') in hits
+
+
+def test_save_round_trip(tmp_path):
+    path = str(tmp_path / 'profiles' / 'localhost.json')
+    profile = SelectorProfile(path, 'localhost')
+    profile.save()  # rien appris : pas de fichier
+    profile.record('name', 'h1::text')
+    profile.save()
+    assert SelectorProfile(path, 'localhost').hits == {'name': {'h1::text': 1}}
+
+
+def test_spider_records_winning_selector():
+    spider = FandomSpider(fandom_url=BASE_URL)
+    spider.selector_profile = SelectorProfile()
+    page = HtmlResponse(f'{BASE_URL}/wiki/Ahri', body=b'<h1 class="page-header__title">Ahri</h1>', encoding='utf-8')
+    assert spider.extract_name(page) == 'Ahri'
+    assert spider.selector_profile.hits == {'name': {'h1.page-header__title::text': 1}}
@@ -0,0 +1,65 @@
+import json
+
+from scrapy.http import HtmlResponse, Request, TextResponse
+
+from fandom_scrap.archive import ArchiveReplayMiddleware, WarcWriter
+from fandom_scrap.spiders.fandom_spider import FandomSpider
+from mock_wiki import MockWiki
+from reextract import fandom_url_from_index
+
+
+BASE_URL = 'http://localhost:8765'
+
+
+def write_archive(tmp_path, fandom_url=BASE_URL):
+    """Archive façon crawl réel : robots.txt et une catégorie avant les fiches"""
+    wiki = MockWiki(20, missing_images=0, redirects=0)
+    path = str(tmp_path / 'localhost_20250101_120000.warc.gz')
+    writer = WarcWriter(path, fandom_url)
+
+    robots = TextResponse(f'{BASE_URL}/robots.txt', body=b'User-agent: *\n', encoding='utf-8')
+    writer.write_response(robots, None)
+    category = HtmlResponse(f'{BASE_URL}/wiki/Category:Characters', body=b'<html></html>', encoding='utf-8')
+    writer.write_response(category, 'parse_category_page')
+    for i in range(3):
+        url = f'{BASE_URL}/wiki/{wiki.titles[i].replace(" ", "_")}'
+        page = HtmlResponse(url, body=wiki.character_page(i, BASE_URL).encode('utf-8'), encoding='utf-8')
+        writer.write_response(page, 'parse_character_page')
+    writer.close()
+    return path
+
+
+def index_path(archive_path):
+    return f"{archive_path[:-len('.warc.gz')]}.cdx.jsonl"
+
+
+def replay(archive_path, fandom_url):
+    spider = FandomSpider(fandom_url=fandom_url, replay_archive=archive_path)
+    middleware = ArchiveReplayMiddleware()
+    items = []
+    for request in spider.replay_requests():
+        response = middleware.process_request(request, spider)
+        items.extend(request.callback(response))
+    middleware.spider_closed(spider)
+    return items
+
+
+def test_fandom_url_read_from_warcinfo(tmp_path):
+    archive_path = write_archive(tmp_path)
+    assert fandom_url_from_index(index_path(archive_path)) == BASE_URL
+
+
+def test_fandom_url_without_warcinfo_skips_robots_txt(tmp_path):
+    archive_path = write_archive(tmp_path, fandom_url=None)
+    with open(index_path(archive_path), encoding='utf-8') as f:
+        assert json.loads(f.readline())['url'].endswith('/robots.txt')
+    assert fandom_url_from_index(index_path(archive_path)) == BASE_URL
+
+
+def test_replayed_items_keep_wiki_fandom_url(tmp_path):
+    archive_path = write_archive(tmp_path)
+    items = replay(archive_path, fandom_url_from_index(index_path(archive_path)))
+
+    assert len(items) == 3
+    assert {item['fandom_url'] for item in items} == {BASE_URL}
+    assert all(item['page_url'].startswith(f'{BASE_URL}/wiki/') for item in items)
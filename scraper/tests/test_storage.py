@@ -0,0 +1,90 @@
+import pytest
+
+from fandom_scrap.storage import CharacterStore
+
+
+def character(name, description='', character_type=None, **fields):
+    return dict({
+        'fandom_name': 'leagueoflegends',
+        'page_url': f'https://leagueoflegends.fandom.com/wiki/{name}',
+        'name': name,
+        'description': description,
+        'character_type': character_type,
+    }, **fields)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CharacterStore(str(tmp_path / 'characters.db'))
+    store.upsert_many([
+        character('Ahri', 'The Nine-Tailed Fox', 'Mage', infobox_data={'region': 'Ionia'}),
+        character('Annie', 'The Dark Child', 'Mage'),
+        character('Garen', 'The Might of Demacia', 'Fighter', categories=['Demacia']),
+    ])
+    yield store
+    store.close()
+
+
+def names(results):
+    return [item['name'] for item in results]
+
+
+def test_upsert_replaces_existing_page(store):
+    store.upsert(character('Ahri', 'Nine tails, one fox', 'Mage'))
+    assert store.get('leagueoflegends', 'https://leagueoflegends.fandom.com/wiki/Ahri')['description'] == \
+        'Nine tails, one fox'
+    assert store.list_fandoms() == [{'fandom_name': 'leagueoflegends', 'count': 3}]
+
+
+def test_json_fields_round_trip(store):
+    ahri = store.get('leagueoflegends', 'https://leagueoflegends.fandom.com/wiki/Ahri')
+    garen = store.get('leagueoflegends', 'https://leagueoflegends.fandom.com/wiki/Garen')
+    assert ahri['infobox_data'] == {'region': 'Ionia'}
+    assert garen['categories'] == ['Demacia']
+
+
+def test_autocomplete_is_case_insensitive(store):
+    assert [r['name'] for r in store.autocomplete('leagueoflegends', 'A')] == ['Ahri', 'Annie']
+    assert [r['name'] for r in store.autocomplete('leagueoflegends', 'an')] == ['Annie']
+    assert store.autocomplete('otherwiki', 'A') == []
+
+
+def test_search_name_and_description(store):
+    assert names(store.search('leagueoflegends', 'demacia')) == ['Garen']
+    assert names(store.search('leagueoflegends', 'Annie')) == ['Annie']
+
+
+def test_by_type(store):
+    assert names(store.by_type('leagueoflegends', 'Mage')) == ['Ahri', 'Annie']
+
+
+@pytest.fixture
+def names_store(tmp_path):
+    store = CharacterStore(str(tmp_path / 'characters.db'))
+    store.upsert_many([
+        character("Kai'Sa", 'Daughter of the Void'),
+        character("Kha'Zix", 'The Voidreaver'),
+        character('Obi-Wan Kenobi', 'Jedi Master'),
+        character('DRN-38', 'A droid'),
+        character('Ahri', 'The Nine-Tailed Fox'),
+    ])
+    yield store
+    store.close()
+
+
+def test_search_with_apostrophe(names_store):
+    assert names(names_store.search('leagueoflegends', "Kai'Sa")) == ["Kai'Sa"]
+    assert names(names_store.search('leagueoflegends', "Kha'")) == ["Kha'Zix"]
+
+
+def test_search_with_hyphen(names_store):
+    assert names(names_store.search('leagueoflegends', 'Obi-Wan')) == ['Obi-Wan Kenobi']
+    assert names(names_store.search('leagueoflegends', 'DRN-38')) == ['DRN-38']
+
+
+def test_search_prefix_and_syntax_characters(names_store):
+    assert names(names_store.search('leagueoflegends', 'Ahr')) == ['Ahri']
+    assert names(names_store.search('leagueoflegends', 'nine-tailed fox')) == ['Ahri']
+    assert names_store.search('leagueoflegends', '"') == []
+    assert names_store.search('leagueoflegends', 'AND OR NOT (') == []
+    assert names_store.search('leagueoflegends', '   ') == []